@@ -0,0 +1,162 @@
+"""Attack bitboards per piece type, for single boards and (N, 12) piece bitboard batches.
+
+The order of the 12 attack bitboards follows `get_piece_bitboards`: white pawn to king, then black pawn to king.
+"""
+
+import chess
+import numpy as np
+
+from .geometry import BETWEEN, BISHOP_RAYS, KING_ATTACKS, KNIGHT_ATTACKS, ROOK_RAYS
+
+_NOT_A_FILE = np.uint64(~chess.BB_FILE_A & chess.BB_ALL)
+_NOT_H_FILE = np.uint64(~chess.BB_FILE_H & chess.BB_ALL)
+_NOT_AB_FILE = np.uint64(~(chess.BB_FILE_A | chess.BB_FILE_B) & chess.BB_ALL)
+_NOT_GH_FILE = np.uint64(~(chess.BB_FILE_G | chess.BB_FILE_H) & chess.BB_ALL)
+_ALL = np.uint64(chess.BB_ALL)
+
+# (shift, mask applied after shifting), positive shifts move towards the 8th rank
+_ORTHOGONAL_DIRECTIONS = ((8, _ALL), (-8, _ALL), (1, _NOT_A_FILE), (-1, _NOT_H_FILE))
+_DIAGONAL_DIRECTIONS = ((9, _NOT_A_FILE), (7, _NOT_H_FILE), (-7, _NOT_A_FILE), (-9, _NOT_H_FILE))
+
+# attacks by square of the pieces that do not slide, as python ints for single boards
+_STEP_ATTACKS = {chess.KNIGHT: KNIGHT_ATTACKS.tolist(), chess.KING: KING_ATTACKS.tolist()}
+
+# set bits of every byte value
+_BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, np.newaxis], axis=1).sum(axis=1, dtype=np.uint8)
+
+
+def get_piece_attacks(board: chess.Board) -> np.ndarray:
+    """The 12 attack bitboards of a board, each the union of the attacks of all pieces of one colour and type."""
+    attacks = []
+    for color in (chess.WHITE, chess.BLACK):
+        for piece_type in chess.PIECE_TYPES:
+            mask = 0
+            step_attacks = _STEP_ATTACKS.get(piece_type)
+            for square in chess.scan_forward(board.pieces_mask(piece_type, color)):
+                mask |= board.attacks_mask(square) if step_attacks is None else step_attacks[square]
+            attacks.append(mask)
+    return np.array(attacks, dtype=np.uint64)
+
+
+def get_piece_attacks_batch(bitboards: np.ndarray) -> np.ndarray:
+    """The (..., 12) attack bitboards of (..., 12) piece bitboards, see `get_piece_attacks`."""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    empty = ~np.bitwise_or.reduce(bitboards, axis=-1, keepdims=True)
+    attacks = np.empty_like(bitboards)
+
+    attacks[..., 0] = _shift(bitboards[..., 0], 9, _NOT_A_FILE) | _shift(bitboards[..., 0], 7, _NOT_H_FILE)
+    attacks[..., 6] = _shift(bitboards[..., 6], -7, _NOT_A_FILE) | _shift(bitboards[..., 6], -9, _NOT_H_FILE)
+    attacks[..., [1, 7]] = _knight_attacks(bitboards[..., [1, 7]])
+    attacks[..., [5, 11]] = _king_attacks(bitboards[..., [5, 11]])
+
+    # bishops, rooks and queens of both colours
+    sliders = bitboards[..., [2, 3, 4, 8, 9, 10]]
+    orthogonal = _sliding_attacks(sliders[..., [1, 2, 4, 5]], empty, _ORTHOGONAL_DIRECTIONS)
+    diagonal = _sliding_attacks(sliders[..., [0, 2, 3, 5]], empty, _DIAGONAL_DIRECTIONS)
+    attacks[..., [2, 8]] = diagonal[..., [0, 2]]
+    attacks[..., [3, 9]] = orthogonal[..., [0, 2]]
+    attacks[..., [4, 10]] = orthogonal[..., [1, 3]] | diagonal[..., [1, 3]]
+    return attacks
+
+
+def get_type_attacks_batch(pieces: np.ndarray, piece_type: chess.PieceType, empty: np.ndarray, color: chess.Color = chess.WHITE) -> np.ndarray:
+    """Union of the attacks of the `pieces` (bitboards of any shape) of one type, sliders stopping at the first non `empty` square."""
+    pieces = np.asarray(pieces, dtype=np.uint64)
+    if piece_type == chess.PAWN:
+        if color:
+            return _shift(pieces, 9, _NOT_A_FILE) | _shift(pieces, 7, _NOT_H_FILE)
+        return _shift(pieces, -7, _NOT_A_FILE) | _shift(pieces, -9, _NOT_H_FILE)
+    if piece_type == chess.KNIGHT:
+        return _knight_attacks(pieces)
+    if piece_type == chess.KING:
+        return _king_attacks(pieces)
+    directions = {chess.BISHOP: _DIAGONAL_DIRECTIONS, chess.ROOK: _ORTHOGONAL_DIRECTIONS, chess.QUEEN: _ORTHOGONAL_DIRECTIONS + _DIAGONAL_DIRECTIONS}
+    return _sliding_attacks(pieces, empty, directions[piece_type])
+
+
+def get_pins(board: chess.Board, color: chess.Color = chess.WHITE) -> list[tuple[chess.Square, int]]:
+    """Every enemy slider pinning to the king of `color` with the bitboard of the squares it pins, see `get_pinned_mask`."""
+    king = board.king(color)
+    if king is None:
+        return []
+    rooks = int(ROOK_RAYS[king]) & (board.rooks | board.queens)
+    bishops = int(BISHOP_RAYS[king]) & (board.bishops | board.queens)
+
+    pins = []
+    for sniper in chess.scan_forward((rooks | bishops) & board.occupied_co[not color]):
+        between = int(BETWEEN[king, sniper])
+        blockers = between & board.occupied
+        if not blockers:
+            pins.append((sniper, between))
+        elif blockers.bit_count() == 1:
+            pins.append((sniper, blockers))
+    return pins
+
+
+def get_pinned_mask(board: chess.Board, color: chess.Color = chess.WHITE) -> int:
+    """Bitboard of the squares pinned to the king of `color`.
+
+    As in `chess.Board.pin`, a square is pinned if it is the only occupied square between the king
+    and an enemy slider, whatever its colour, and every empty square between them is if there is none.
+    """
+    pinned = 0
+    for _, squares in get_pins(board, color):
+        pinned |= squares
+    return pinned
+
+
+def get_pinned_mask_batch(bitboards: np.ndarray, color: chess.Color = chess.WHITE) -> np.ndarray:
+    """Squares pinned to the king of `color` for (..., 12) piece bitboards as (...,) bitboards, see `get_pinned_mask`."""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    own, enemy = (0, 6) if color else (6, 0)
+    king = bitboards[..., own + 5]
+    empty = ~np.bitwise_or.reduce(bitboards, axis=-1)
+    rooks = bitboards[..., enemy + 3] | bitboards[..., enemy + 4]
+    bishops = bitboards[..., enemy + 2] | bitboards[..., enemy + 4]
+
+    pinned = np.zeros_like(king)
+    for directions, snipers in ((_ORTHOGONAL_DIRECTIONS, rooks), (_DIAGONAL_DIRECTIONS, bishops)):
+        for direction in directions:
+            ray = _sliding_attacks(king, empty, (direction,))
+            blocker = ray & ~empty
+            behind = _sliding_attacks(blocker, empty, (direction,))
+            pinned |= np.where((ray & snipers) != 0, ray & empty, 0) | np.where((behind & snipers) != 0, blocker, 0)
+    return pinned
+
+
+def popcount(bitboards: np.ndarray) -> np.ndarray:
+    """Number of set squares of bitboards of any shape."""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    counts = _BYTE_POPCOUNT[bitboards.reshape(-1).view(np.uint8)]
+    return counts.reshape((*bitboards.shape, 8)).sum(axis=-1, dtype=np.int64)
+
+
+def _shift(bb: np.ndarray, shift: int, mask: np.uint64) -> np.ndarray:
+    if shift > 0:
+        return (bb << np.uint64(shift)) & mask
+    return (bb >> np.uint64(-shift)) & mask
+
+
+def _knight_attacks(knights: np.ndarray) -> np.ndarray:
+    one_file = _shift(knights, 1, _NOT_A_FILE) | _shift(knights, -1, _NOT_H_FILE)
+    two_files = _shift(knights, 2, _NOT_AB_FILE) | _shift(knights, -2, _NOT_GH_FILE)
+    return _shift(one_file, 16, _ALL) | _shift(one_file, -16, _ALL) | _shift(two_files, 8, _ALL) | _shift(two_files, -8, _ALL)
+
+
+def _king_attacks(kings: np.ndarray) -> np.ndarray:
+    attacks = _shift(kings, 1, _NOT_A_FILE) | _shift(kings, -1, _NOT_H_FILE)
+    kings = kings | attacks
+    return attacks | _shift(kings, 8, _ALL) | _shift(kings, -8, _ALL)
+
+
+def _sliding_attacks(sliders: np.ndarray, empty: np.ndarray, directions: tuple) -> np.ndarray:
+    """Kogge-Stone fill of the sliders along each direction, stopping at and including the first occupied square."""
+    attacks = np.zeros_like(sliders)
+    for shift, mask in directions:
+        generator = sliders
+        propagator = empty & mask
+        for step in (1, 2, 4):
+            generator = generator | (propagator & _shift(generator, shift * step, _ALL))
+            propagator = propagator & _shift(propagator, shift * step, _ALL)
+        attacks |= _shift(generator, shift, mask)
+    return attacks
@@ -0,0 +1,68 @@
+"""Bounded LRU cache of encoded positions, keyed by their polyglot Zobrist hash."""
+
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import NamedTuple
+
+import chess
+import chess.polyglot
+import numpy as np
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class FeatureCache:
+    def __init__(self, maxsize: int) -> None:
+        """Create an empty cache.
+
+        Parameters
+        ----------
+        maxsize : int
+            number of encoded positions kept, the least recently used one is evicted first
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, np.ndarray] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def key(board: chess.Board, transformation_type: str, values: dict | None = None) -> tuple:
+        """Position, extractor and piece values, the Zobrist hash ignoring the move counters."""
+        values_key = None if values is None else tuple(sorted(values.items()))
+        return chess.polyglot.zobrist_hash(board), transformation_type, values_key
+
+    def get(self, key: Hashable) -> np.ndarray | None:
+        """The cached read-only array of `key`, None (and a miss) if it is not cached."""
+        encoded = self._entries.get(key)
+        if encoded is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return encoded
+
+    def put(self, key: Hashable, encoded: np.ndarray) -> np.ndarray:
+        """Cache a read-only copy of `encoded` and return it."""
+        encoded = np.array(encoded)
+        encoded.flags.writeable = False
+        self._entries[key] = encoded
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return encoded
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
@@ -1,14 +1,13 @@
-from itertools import product
+from collections.abc import Iterable
 
 import chess
 import numpy as np
+import numpy.typing as npt
 
-from .neighborhood_transform import get_neighborhood
+from .attacks import get_piece_attacks, get_piece_attacks_batch
+from .neighborhood_transform import get_neighborhoods
 
-
-class StockfishExtractor:
-    def extract(self, feature_names: list[str] | None = None) -> list[float | int]:
-        pass
+PIECE_NAMES = ["pawn", "knight", "bishop", "rook", "queen", "king"]
 
 
 def to_white_moving(board: chess.Board) -> chess.Board:
@@ -21,113 +20,180 @@ def to_fen(board: chess.Board) -> str:
     return board.fen()
 
 
-def bitboards_to_array(bb: np.ndarray) -> np.ndarray:
-    bb = np.asarray(bb, dtype=np.uint64)[:, np.newaxis]
-    s = 8 * np.arange(7, -1, -1, dtype=np.uint64)
-    b = (bb >> s).astype(np.uint8)
-    b = np.unpackbits(b, bitorder="little")
-    return b.reshape((-1, 8, 8))
+def get_values_array(values: dict | None = None, dtype: npt.DTypeLike = None, *, signed: bool = False) -> np.ndarray:
+    """The 12 piece values, white pawn to king followed by black pawn to king.
+
+    Parameters
+    ----------
+    values : dict | None, optional
+        value by piece name, by default the usual material values with the king as 500
+    dtype : npt.DTypeLike, optional
+        type of the values, by default the narrowest signed integer type for integer values
+    signed : bool, optional
+        whether the negated values have to fit `dtype` as well, by default False
+
+    Returns
+    -------
+    np.ndarray
+        the (12,) values
+
+    Raises
+    ------
+    ValueError
+        if an integer `dtype` cannot hold the values, or they are not whole numbers
+    """
+    if values is None:
+        values = {
+            "queen": 9,
+            "king": 500,
+            "rook": 5,
+            "bishop": 3,
+            "knight": 3,
+            "pawn": 1,
+        }
+    values_array = np.array([values[piece_name] for piece_name in PIECE_NAMES] * 2)
+    if dtype is not None:
+        _check_values_fit(values_array, np.dtype(dtype), signed=signed)
+        return values_array.astype(dtype)
+    if np.issubdtype(values_array.dtype, np.integer):
+        # narrowest signed type holding +-values, this keeps the broadcast multiply cheap
+        values_array = values_array.astype(np.min_scalar_type(-int(np.abs(values_array).max()) - 1))
+    return values_array
+
+
+def _check_values_fit(values_array: np.ndarray, dtype: np.dtype, *, signed: bool) -> None:
+    if dtype.kind == "b" or (signed and dtype.kind == "u"):
+        msg = f"{dtype} cannot hold signed piece values"
+        raise ValueError(msg)
+    if dtype.kind not in "iu":
+        return
+    if np.any(values_array != np.round(values_array)):
+        msg = f"{dtype} cannot hold fractional piece values"
+        raise ValueError(msg)
+    low, high = values_array.min(), values_array.max()
+    if signed:
+        low, high = min(low, -high), max(high, -low)
+    info = np.iinfo(dtype)
+    if low < info.min or high > info.max:
+        msg = f"piece values from {low} to {high} do not fit {dtype}"
+        raise ValueError(msg)
+
+
+def get_piece_bitboards(board: chess.Board) -> np.ndarray:
+    """The 12 piece bitboards of a board, white pawn to king followed by black pawn to king."""
+    return np.array(_get_piece_bitboards(board), dtype=np.uint64)
+
+
+def get_piece_bitboards_batch(boards: Iterable[chess.Board]) -> np.ndarray:
+    """The (N, 12) piece bitboards of several boards, see `get_piece_bitboards`."""
+    return np.array([_get_piece_bitboards(board) for board in boards], dtype=np.uint64).reshape((-1, 12))
+
+
+def _get_piece_bitboards(board: chess.Board) -> list[int]:
+    black, white = board.occupied_co
+    pieces = (board.pawns, board.knights, board.bishops, board.rooks, board.queens, board.kings)
+    return [white & piece for piece in pieces] + [black & piece for piece in pieces]
+
+
+def bitboards_to_array(bb: np.ndarray, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """Unpack bitboards of any shape (...) into (..., 8, 8) of `dtype` (uint8 by default), the first row being the 8th rank."""
+    bb = np.asarray(bb, dtype=np.uint64)
+    b = bb.reshape(-1).astype(">u8").view(np.uint8)
+    b = np.unpackbits(b, bitorder="little").reshape((*bb.shape, 8, 8))
+    if dtype is None:
+        return b
+    dtype = np.dtype(dtype)
+    # the 0/1 bytes are already valid int8 and bool values
+    return b.view(dtype) if dtype.itemsize == 1 else b.astype(dtype)
 
 
 def bitboard_to_array(bb: int) -> np.ndarray:
-    s = 8 * np.arange(7, -1, -1, dtype=np.uint64)
-    print(bb.shape, s.shape)
-    b = (bb >> s).astype(np.uint8)
-    b = np.unpackbits(b, bitorder="little")
-    return b.reshape(8, 8)
+    return bitboards_to_array(bb)
 
 
-def to_bitboard(board: chess.Board) -> np.ndarray:
-    values = {"queen": 1, "king": 1, "rook": 1, "bishop": 1, "knight": 1, "pawn": 1}
-    return to_valued_bitboard(board, values)
+def unpack_bitboards(packed: np.ndarray) -> np.ndarray:
+    """Unpack the output of a packed extractor, (..., planes) uint64, into its (..., planes, 8, 8) bit planes."""
+    return bitboards_to_array(packed)
 
 
-def to_unified_neg_bitboard(board: chess.Board) -> np.ndarray:
-    bitboards = to_bitboard(board).astype(np.int16)
-    return bitboards[:6] - bitboards[6:]
+def to_bitboard(board: chess.Board, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return to_bitboard_batch(get_piece_bitboards(board), dtype=dtype)
 
 
-def to_unified_bitboard(board: chess.Board) -> np.ndarray:
-    bitboards = np.array(
-        [
-            board.pawns,
-            board.knights,
-            board.bishops,
-            board.rooks,
-            board.queens,
-            board.kings,
-        ],
-        dtype=np.uint64,
-    )
-    return bitboards_to_array(bitboards)
+def to_bitboard_batch(bitboards: np.ndarray, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return bitboards_to_array(bitboards, dtype)
 
 
-def to_valued_bitboard(board: chess.Board, values: dict | None = None) -> np.ndarray:
-    if values is None:
-        values = {
-            "queen": 9,
-            "king": 500,
-            "rook": 5,
-            "bishop": 3,
-            "knight": 3,
-            "pawn": 1,
-        }
-    black, white = board.occupied_co
+def to_packed_bitboard(board: chess.Board) -> np.ndarray:
+    """`to_bitboard` with every plane packed into one uint64 as (12,), see `unpack_bitboards`."""
+    return get_piece_bitboards(board)
+
+
+def to_packed_bitboard_batch(bitboards: np.ndarray) -> np.ndarray:
+    return np.array(bitboards, dtype=np.uint64)
+
+
+def to_unified_neg_bitboard(board: chess.Board, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return to_unified_neg_bitboard_batch(get_piece_bitboards(board), dtype=dtype)
+
+
+def to_unified_neg_bitboard_batch(bitboards: np.ndarray, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """White minus black bitboards of (..., 12) piece bitboards as (..., 6, 8, 8) of a signed `dtype` (int8 by default)."""
+    dtype = np.dtype(np.int8 if dtype is None else dtype)
+    if dtype.kind in "bu":
+        msg = f"{dtype} cannot hold the negative black pieces"
+        raise ValueError(msg)
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    return bitboards_to_array(bitboards[..., :6], dtype) - bitboards_to_array(bitboards[..., 6:], dtype)
+
 
-    values_array = np.array(
-        [
-            values["pawn"],
-            values["knight"],
-            values["bishop"],
-            values["rook"],
-            values["queen"],
-            values["king"],
-            values["pawn"],
-            values["knight"],
-            values["bishop"],
-            values["rook"],
-            values["queen"],
-            values["king"],
-        ]
-    )
-
-    bitboards = np.array(
-        [
-            white & board.pawns,
-            white & board.knights,
-            white & board.bishops,
-            white & board.rooks,
-            white & board.queens,
-            white & board.kings,
-            black & board.pawns,
-            black & board.knights,
-            black & board.bishops,
-            black & board.rooks,
-            black & board.queens,
-            black & board.kings,
-        ],
-        dtype=np.uint64,
-    )
-    bitboard = bitboards_to_array(bitboards)
-    return bitboard * values_array.reshape((-1, 1, 1))
+def to_unified_bitboard(board: chess.Board, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return to_unified_bitboard_batch(get_piece_bitboards(board), dtype=dtype)
+
+
+def to_unified_bitboard_batch(bitboards: np.ndarray, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    return bitboards_to_array(bitboards[..., :6] | bitboards[..., 6:], dtype)
+
+
+def to_valued_bitboard(board: chess.Board, values: dict | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return to_valued_bitboard_batch(get_piece_bitboards(board), values, dtype=dtype)
+
+
+def to_valued_bitboard_batch(bitboards: np.ndarray, values: dict | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """Valued bitboards of (..., 12) piece bitboards as (..., 12, 8, 8), of `dtype` or else the type of the values."""
+    values_array = get_values_array(values, dtype)
+    return np.multiply(bitboards_to_array(bitboards), values_array.reshape((-1, 1, 1)), dtype=values_array.dtype)
 
 
 def bitboard_to_bitvector(bitboard: chess.Board) -> np.ndarray:
     return bitboard.reshape(-1)
 
 
-def get_unified_valued_bitboard(board: chess.Board, values: dict | None = None) -> np.ndarray:
-    valued_board = to_valued_bitboard(board, values)
-    valued_board[-6:] = -valued_board[-6:]
-    return np.sum(valued_board, axis=0)
+def get_unified_valued_bitboard(board: chess.Board, values: dict | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return get_unified_valued_bitboard_batch(get_piece_bitboards(board), values, dtype=dtype)
+
+
+def get_unified_valued_bitboard_batch(bitboards: np.ndarray, values: dict | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """Unified valued boards of (..., 12) piece bitboards as (..., 8, 8), black pieces negative."""
+    values_array = get_values_array(values, dtype, signed=True)
+    values_array[6:] = -values_array[6:]
+    # at most one piece per square, so the sum fits the values' type
+    valued = np.multiply(bitboards_to_array(bitboards), values_array.reshape((-1, 1, 1)), dtype=values_array.dtype)
+    return np.sum(valued, axis=-3, dtype=values_array.dtype)
+
+
+def to_chess_neighborhoods(board: chess.Board, values: dict | None = None, *, clockwise: bool = False, dtype: npt.DTypeLike = None) -> np.ndarray:
+    valued_board = get_unified_valued_bitboard(board, values, dtype=dtype)
+    return get_neighborhoods(valued_board, clockwise=clockwise)
 
 
-def to_chess_neighborhoods(board: chess.Board, *, clockwise: bool = False) -> np.ndarray:
-    valued_board = get_unified_valued_bitboard(board)
-    neighborhoods = []
-    for x, y in product(range(8), repeat=2):
-        neighborhoods.append(get_neighborhood(valued_board, x, y, clockwise=clockwise))
-    return np.array(neighborhoods)
+def to_chess_neighborhoods_batch(
+    bitboards: np.ndarray, values: dict | None = None, *, clockwise: bool = False, dtype: npt.DTypeLike = None
+) -> np.ndarray:
+    """Neighborhoods of (N, 12) piece bitboards as (N, 64, 17)."""
+    valued_boards = get_unified_valued_bitboard_batch(bitboards, values, dtype=dtype)
+    return get_neighborhoods(valued_boards, clockwise=clockwise)
 
 
 def to_san(board: chess.Board) -> str:
@@ -141,126 +207,75 @@ def to_san(board: chess.Board) -> str:
     return " ".join(move_stack)
 
 
-def to_bit_attack_map(board: chess.Board) -> np.ndarray:
-    attack_map = np.zeros((2, 64))
-    for square in chess.SQUARES:
-        white_attackers = board.attackers(chess.WHITE, square)
-        black_attackers = board.attackers(chess.BLACK, square)
-        if white_attackers:
-            attack_map[0, square] = 1
-        if black_attackers:
-            attack_map[1, square] = 1
+def to_bit_attack_map(board: chess.Board, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return bitboards_to_array(to_packed_bit_attack_map(board), dtype)
 
-    return np.flip(attack_map.reshape((2, 8, 8)), axis=1)
 
+def to_bit_attack_map_batch(bitboards: np.ndarray, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """Bit attack maps of (..., 12) piece bitboards as (..., 2, 8, 8)."""
+    return bitboards_to_array(to_packed_bit_attack_map_batch(bitboards), dtype)
+
+
+def to_packed_bit_attack_map(board: chess.Board) -> np.ndarray:
+    """`to_bit_attack_map` with every plane packed into one uint64 as (2,), see `unpack_bitboards`."""
+    return _attacks_to_colour_bitboards(get_piece_attacks(board))
+
+
+def to_packed_bit_attack_map_batch(bitboards: np.ndarray) -> np.ndarray:
+    return _attacks_to_colour_bitboards(get_piece_attacks_batch(bitboards))
+
+
+def _attacks_to_colour_bitboards(piece_attacks: np.ndarray, *, defend: bool = False) -> np.ndarray:
+    white_attacks = np.bitwise_or.reduce(piece_attacks[..., :6], axis=-1)
+    black_attacks = np.bitwise_or.reduce(piece_attacks[..., 6:], axis=-1)
+    attacks = (black_attacks, white_attacks) if defend else (white_attacks, black_attacks)
+    return np.stack(attacks, axis=-1)
+
+
+def to_valued_attack_map(board: chess.Board, values: dict | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return _attacks_to_valued_map(get_piece_attacks(board), values, dtype=dtype)
+
+
+def to_valued_attack_map_batch(bitboards: np.ndarray, values: dict | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """Valued attack maps of (..., 12) piece bitboards as (..., 12, 8, 8)."""
+    return _attacks_to_valued_map(get_piece_attacks_batch(bitboards), values, dtype=dtype)
+
+
+def _attacks_to_valued_map(piece_attacks: np.ndarray, values: dict | None = None, *, defend: bool = False, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """Keep every square only in the plane of its least valuable attacker per colour, masking from pawn to king."""
+    attacks = piece_attacks.reshape((*piece_attacks.shape[:-1], 2, 6))
+    attacked_by_cheaper = np.bitwise_or.accumulate(attacks, axis=-1)
+    min_attacks = attacks.copy()
+    min_attacks[..., 1:] &= ~attacked_by_cheaper[..., :-1]
+    if defend:
+        min_attacks = min_attacks[..., ::-1, :]
+    min_attacks = min_attacks.reshape(piece_attacks.shape)
+    values_array = get_values_array(values, dtype)
+    return np.multiply(bitboards_to_array(min_attacks), values_array.reshape((-1, 1, 1)), dtype=values_array.dtype)
+
+
+def to_bit_defend_map(board: chess.Board, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return bitboards_to_array(to_packed_bit_defend_map(board), dtype)
+
+
+def to_bit_defend_map_batch(bitboards: np.ndarray, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """Bit defend maps of (..., 12) piece bitboards as (..., 2, 8, 8)."""
+    return bitboards_to_array(to_packed_bit_defend_map_batch(bitboards), dtype)
+
+
+def to_packed_bit_defend_map(board: chess.Board) -> np.ndarray:
+    """`to_bit_defend_map` with every plane packed into one uint64 as (2,), see `unpack_bitboards`."""
+    return _attacks_to_colour_bitboards(get_piece_attacks(board), defend=True)
+
+
+def to_packed_bit_defend_map_batch(bitboards: np.ndarray) -> np.ndarray:
+    return _attacks_to_colour_bitboards(get_piece_attacks_batch(bitboards), defend=True)
+
+
+def to_valued_defend_map(board: chess.Board, values: dict | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    return _attacks_to_valued_map(get_piece_attacks(board), values, defend=True, dtype=dtype)
 
-def to_valued_attack_map(board: chess.Board, values: dict | None = None) -> np.ndarray:
-    if values is None:
-        values = {
-            "queen": 9,
-            "king": 500,
-            "rook": 5,
-            "bishop": 3,
-            "knight": 3,
-            "pawn": 1,
-        }
-    values_array = np.array(
-        [
-            values["pawn"],
-            values["knight"],
-            values["bishop"],
-            values["rook"],
-            values["queen"],
-            values["king"],
-            values["pawn"],
-            values["knight"],
-            values["bishop"],
-            values["rook"],
-            values["queen"],
-            values["king"],
-        ]
-    )
-
-    attack_map = np.zeros((2 * 6, 64))
-    for square in chess.SQUARES:
-        white_attackers = board.attackers(chess.WHITE, square)
-        black_attackers = board.attackers(chess.BLACK, square)
-
-        white_min_attacker = min(
-            (board.piece_type_at(white_attacker) for white_attacker in white_attackers),
-            default=-1,
-        )
-        if white_min_attacker >= 0:
-            attack_map[white_min_attacker - 1, square] = 1
-
-        black_min_attacker = min(
-            (board.piece_type_at(black_attacker) for black_attacker in black_attackers),
-            default=-1,
-        )
-        if black_min_attacker >= 0:
-            attack_map[5 + black_min_attacker, square] = 1
-
-    return np.flip(attack_map.reshape((12, 8, 8)), axis=1) * values_array.reshape((-1, 1, 1))
-
-
-def to_bit_defend_map(board: chess.Board) -> np.ndarray:
-    attack_map = np.zeros((2, 64))
-    for square in chess.SQUARES:
-        white_defenders = board.attackers(chess.BLACK, square)
-        black_defenders = board.attackers(chess.WHITE, square)
-        if white_defenders:
-            attack_map[0, square] = 1
-        if black_defenders:
-            attack_map[1, square] = 1
-
-    return np.flip(attack_map.reshape((2, 8, 8)), axis=1)
-
-
-def to_valued_defend_map(board: chess.Board, values: dict | None = None) -> np.ndarray:
-    if values is None:
-        values = {
-            "queen": 9,
-            "king": 500,
-            "rook": 5,
-            "bishop": 3,
-            "knight": 3,
-            "pawn": 1,
-        }
 
-    values_array = np.array(
-        [
-            values["pawn"],
-            values["knight"],
-            values["bishop"],
-            values["rook"],
-            values["queen"],
-            values["king"],
-            values["pawn"],
-            values["knight"],
-            values["bishop"],
-            values["rook"],
-            values["queen"],
-            values["king"],
-        ]
-    )
-
-    defend_map = np.zeros((2 * 6, 64))
-    for square in chess.SQUARES:
-        white_defenders = board.attackers(chess.BLACK, square)
-        black_defenders = board.attackers(chess.WHITE, square)
-
-        white_min_defender = min(
-            (board.piece_type_at(white_attacker) for white_attacker in white_defenders),
-            default=-1,
-        )
-        if white_min_defender >= 0:
-            defend_map[white_min_defender - 1, square] = 1
-
-        black_min_defender = min(
-            (board.piece_type_at(black_attacker) for black_attacker in black_defenders),
-            default=-1,
-        )
-        if black_min_defender >= 0:
-            defend_map[5 + black_min_defender, square] = 1
-
-    return np.flip(defend_map.reshape((12, 8, 8)), axis=1) * values_array.reshape((-1, 1, 1))
+def to_valued_defend_map_batch(bitboards: np.ndarray, values: dict | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """Valued defend maps of (..., 12) piece bitboards as (..., 12, 8, 8)."""
+    return _attacks_to_valued_map(get_piece_attacks_batch(bitboards), values, defend=True, dtype=dtype)
@@ -0,0 +1,152 @@
+"""Build a sharded feature dataset from PGN and FEN files with several processes."""
+
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import NamedTuple
+
+import chess
+import chess.pgn
+import numpy as np
+import numpy.typing as npt
+
+from .pipeline import METADATA_DTYPE, RESULTS
+from .transformer import ChessTransformer
+
+
+class Shard(NamedTuple):
+    index: int
+    path: Path
+    offset: int
+    # index of the first game or line of the shard over all files, as `game` in `pipeline.METADATA_DTYPE`
+    first: int
+    count: int
+
+
+def plan_shards(paths: Iterable[str | Path], games_per_shard: int = 1000, positions_per_shard: int = 100_000) -> list[Shard]:
+    """Split the files into shards of whole games (.pgn) or FEN lines (any other file), in file order."""
+    shards, first = [], 0
+    for path in map(Path, paths):
+        if path.suffix.lower() == ".pgn":
+            offsets = _scan_game_offsets(path)
+            count = games_per_shard
+        else:
+            offsets = _scan_line_offsets(path)
+            count = positions_per_shard
+        for start in range(0, len(offsets), count):
+            shards.append(Shard(len(shards), path, offsets[start], first + start, len(offsets[start : start + count])))
+        first += len(offsets)
+    return shards
+
+
+def build_dataset(  # noqa: PLR0913
+    paths: Iterable[str | Path],
+    output_dir: str | Path,
+    transformation_type: str,
+    *,
+    workers: int | None = None,
+    games_per_shard: int = 1000,
+    positions_per_shard: int = 100_000,
+    values: dict | None = None,
+    dtype: npt.DTypeLike = None,
+) -> list[Path]:
+    """Encode all positions of the files in parallel and write one `shard_<index>.npz` per shard.
+
+    Each shard file holds `features` and `metadata` (see `pipeline.METADATA_DTYPE`). The shards and
+    the positions within them keep the order of the input files, whatever the number of workers.
+    The `game` index runs over all files, a FEN line counts as one game.
+
+    Parameters
+    ----------
+    paths : Iterable[str | Path]
+        PGN files (.pgn) or files with one FEN per line
+    output_dir : str | Path
+        directory for the shard files, it is created if needed
+    transformation_type : str
+        name of the extractor, it has to produce fixed size arrays
+    workers : int | None, optional
+        number of processes, by default os.cpu_count()
+    games_per_shard : int, optional
+        games of a PGN file per shard, by default 1000
+    positions_per_shard : int, optional
+        lines of a FEN file per shard, by default 100_000
+    values : dict | None, optional
+        piece values passed to the extractor, by default None
+    dtype : npt.DTypeLike, optional
+        type of the features, by default the extractor's own `dtype`
+
+    Returns
+    -------
+    list[Path]
+        the shard files in order
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    shards = plan_shards(paths, games_per_shard, positions_per_shard)
+    build = partial(_build_shard, output_dir=output_dir, transformation_type=transformation_type, values=values, dtype=dtype)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return list(executor.map(build, shards))
+
+
+def _build_shard(shard: Shard, *, output_dir: Path, transformation_type: str, values: dict | None, dtype: npt.DTypeLike) -> Path:
+    transformer = ChessTransformer(transformation_type, dtype)
+    with shard.path.open(encoding="utf-8") as file:
+        file.seek(shard.offset)
+        if shard.path.suffix.lower() == ".pgn":
+            features, metadata = _encode_games(file, shard.count, transformer, values)
+        else:
+            features, metadata = _encode_fens(file, shard.count, transformer, values)
+    metadata["game"] += shard.first
+
+    output_path = output_dir / f"shard_{shard.index:05d}.npz"
+    np.savez(output_path, features=features, metadata=metadata)
+    return output_path
+
+
+def _encode_games(file: Iterator[str], count: int, transformer: ChessTransformer, values: dict | None) -> tuple[np.ndarray, np.ndarray]:
+    features, metadata = [], []
+    for game_index in range(count):
+        game = chess.pgn.read_game(file)
+        encoded = transformer.transform_game(game, values=values)
+        game_metadata = np.empty(len(encoded), dtype=METADATA_DTYPE)
+        game_metadata["game"] = game_index
+        game_metadata["ply"] = np.arange(len(encoded))
+        game_metadata["result"] = RESULTS.get(game.headers.get("Result"), np.nan)
+        features.append(encoded)
+        metadata.append(game_metadata)
+    return np.concatenate(features), np.concatenate(metadata)
+
+
+def _encode_fens(file: Iterator[str], count: int, transformer: ChessTransformer, values: dict | None) -> tuple[np.ndarray, np.ndarray]:
+    lines = (line.strip() for line in file)
+    boards = [chess.Board(line) for line in islice(filter(None, lines), count)]
+    metadata = np.empty(len(boards), dtype=METADATA_DTYPE)
+    metadata["game"] = np.arange(len(boards))
+    metadata["ply"] = [board.ply() for board in boards]
+    metadata["result"] = np.nan
+    return transformer.transform_batch(boards, values=values), metadata
+
+
+def _scan_game_offsets(path: Path) -> list[int]:
+    offsets = []
+    with path.open(encoding="utf-8") as pgn_file:
+        while True:
+            offset = pgn_file.tell()
+            if chess.pgn.read_headers(pgn_file) is None:
+                return offsets
+            offsets.append(offset)
+
+
+def _scan_line_offsets(path: Path) -> list[int]:
+    offsets = []
+    with path.open(encoding="utf-8") as fen_file:
+        while True:
+            offset = fen_file.tell()
+            line = fen_file.readline()
+            if not line:
+                return offsets
+            if line.strip():
+                offsets.append(offset)
@@ -7,7 +7,11 @@ from .extractors import (  # noqa: F401
     ExtractorBase,
     FenExtractor,
     NeighborhoodExtractor,
+    PackedBitAttackExtractor,
+    PackedBitboardExtractor,
+    PackedBitDefendExtractor,
     SanExtractor,
+    StockfishExtractor,
     UnifiedNegBitboardExtractor,
     UnifiedValuedBitboardExtractor,
     ValuedAttackExtractor,
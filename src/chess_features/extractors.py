@@ -1,49 +1,159 @@
 from abc import ABC, abstractmethod
+from collections.abc import Sequence
 
 import chess
 import numpy as np
+import numpy.typing as npt
 
 from .chess_features import (
+    get_piece_bitboards_batch,
     get_unified_valued_bitboard,
+    get_unified_valued_bitboard_batch,
     to_bit_attack_map,
+    to_bit_attack_map_batch,
     to_bit_defend_map,
+    to_bit_defend_map_batch,
     to_bitboard,
+    to_bitboard_batch,
     to_chess_neighborhoods,
+    to_chess_neighborhoods_batch,
     to_fen,
+    to_packed_bit_attack_map,
+    to_packed_bit_attack_map_batch,
+    to_packed_bit_defend_map,
+    to_packed_bit_defend_map_batch,
+    to_packed_bitboard,
+    to_packed_bitboard_batch,
     to_san,
     to_unified_neg_bitboard,
+    to_unified_neg_bitboard_batch,
     to_valued_attack_map,
+    to_valued_attack_map_batch,
     to_valued_bitboard,
+    to_valued_bitboard_batch,
     to_valued_defend_map,
+    to_valued_defend_map_batch,
     to_white_moving,
 )
+from .stockfish_features import STOCKFISH_FEATURES, FeatureExtractionFactory, to_stockfish_representation, to_stockfish_representation_batch
 
 
 class ExtractorBase(ABC):
+    shape: tuple[int, ...] | None = None
+    dtype: type[np.generic] | None = None
+    # whether batch_bitboards can encode positions given only as (N, 12) piece bitboards
+    from_bitboards: bool = False
+    # one uint64 per plane, so the dtype cannot be changed
+    packed: bool = False
+
     @abstractmethod
     def __call__(self, board: chess.Board, **_: dict) -> np.ndarray | str | chess.Board:
         pass
 
+    def batch(self, boards: Sequence[chess.Board], out: np.ndarray, **kwargs: dict) -> np.ndarray:
+        if self.from_bitboards:
+            return self.batch_bitboards(get_piece_bitboards_batch(boards), out, **kwargs)
+        for i, board in enumerate(boards):
+            out[i] = self(board, **kwargs)
+        return out
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        raise NotImplementedError
+
 
 class BitAttackExtractor(ExtractorBase):
-    def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
-        return to_bit_attack_map(board)
+    shape = (2, 8, 8)
+    dtype = np.uint8
+    from_bitboards = True
+
+    def __call__(self, board: chess.Board, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        return to_bit_attack_map(board, dtype=dtype)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        out[...] = to_bit_attack_map_batch(bitboards, dtype=dtype)
+        return out
 
 
 class BitDefendExtractor(ExtractorBase):
-    def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
-        return to_bit_defend_map(board)
+    shape = (2, 8, 8)
+    dtype = np.uint8
+    from_bitboards = True
+
+    def __call__(self, board: chess.Board, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        return to_bit_defend_map(board, dtype=dtype)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        out[...] = to_bit_defend_map_batch(bitboards, dtype=dtype)
+        return out
 
 
 class BitboardExtractor(ExtractorBase):
-    def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
-        return to_bitboard(board)
+    shape = (12, 8, 8)
+    dtype = np.uint8
+    from_bitboards = True
+
+    def __call__(self, board: chess.Board, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        return to_bitboard(board, dtype=dtype)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        out[...] = to_bitboard_batch(bitboards, dtype=dtype)
+        return out
 
 
 class NeighborhoodExtractor(ExtractorBase):
+    shape = (64, 17)
+    dtype = np.float32
+    from_bitboards = True
+
     def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
         return to_chess_neighborhoods(board, **_)
 
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        out[...] = to_chess_neighborhoods_batch(bitboards, **_)
+        return out
+
+
+class PackedBitAttackExtractor(ExtractorBase):
+    shape = (2,)
+    dtype = np.uint64
+    from_bitboards = True
+    packed = True
+
+    def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
+        return to_packed_bit_attack_map(board)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        out[...] = to_packed_bit_attack_map_batch(bitboards)
+        return out
+
+
+class PackedBitDefendExtractor(ExtractorBase):
+    shape = (2,)
+    dtype = np.uint64
+    from_bitboards = True
+    packed = True
+
+    def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
+        return to_packed_bit_defend_map(board)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        out[...] = to_packed_bit_defend_map_batch(bitboards)
+        return out
+
+
+class PackedBitboardExtractor(ExtractorBase):
+    shape = (12,)
+    dtype = np.uint64
+    from_bitboards = True
+    packed = True
+
+    def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
+        return to_packed_bitboard(board)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        out[...] = to_packed_bitboard_batch(bitboards)
+        return out
+
 
 class FenExtractor(ExtractorBase):
     def __call__(self, board: chess.Board, **_: dict) -> str:
@@ -55,25 +165,70 @@ class SanExtractor(ExtractorBase):
         return to_san(board)
 
 
+class StockfishExtractor(ExtractorBase):
+    shape = (len(FeatureExtractionFactory().get_vector_names(STOCKFISH_FEATURES)),)
+    dtype = np.float32
+    from_bitboards = True
+
+    def __call__(self, board: chess.Board, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        return to_stockfish_representation(board, dtype=dtype)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        out[...] = to_stockfish_representation_batch(bitboards, dtype=dtype)
+        return out
+
+
 class UnifiedNegBitboardExtractor(ExtractorBase):
-    def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
-        return to_unified_neg_bitboard(board)
+    shape = (6, 8, 8)
+    dtype = np.int8
+    from_bitboards = True
+
+    def __call__(self, board: chess.Board, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        return to_unified_neg_bitboard(board, dtype=dtype)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, dtype: npt.DTypeLike = None, **_: dict) -> np.ndarray:
+        out[...] = to_unified_neg_bitboard_batch(bitboards, dtype=dtype)
+        return out
 
 
 class ValuedAttackExtractor(ExtractorBase):
+    shape = (12, 8, 8)
+    dtype = np.float32
+    from_bitboards = True
+
     def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
         return to_valued_attack_map(board, **_)
 
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        out[...] = to_valued_attack_map_batch(bitboards, **_)
+        return out
+
 
 class ValuedBitboardExtractor(ExtractorBase):
+    shape = (12, 8, 8)
+    dtype = np.float32
+    from_bitboards = True
+
     def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
         return to_valued_bitboard(board, **_)
 
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        out[...] = to_valued_bitboard_batch(bitboards, **_)
+        return out
+
 
 class ValuedDefendExtractor(ExtractorBase):
+    shape = (12, 8, 8)
+    dtype = np.float32
+    from_bitboards = True
+
     def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
         return to_valued_defend_map(board, **_)
 
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        out[...] = to_valued_defend_map_batch(bitboards, **_)
+        return out
+
 
 class WhiteMovingExtractor(ExtractorBase):
     def __call__(self, board: chess.Board, **_: dict) -> chess.Board:
@@ -81,5 +236,13 @@ class WhiteMovingExtractor(ExtractorBase):
 
 
 class UnifiedValuedBitboardExtractor(ExtractorBase):
+    shape = (8, 8)
+    dtype = np.float32
+    from_bitboards = True
+
     def __call__(self, board: chess.Board, **_: dict) -> np.ndarray:
         return get_unified_valued_bitboard(board, **_)
+
+    def batch_bitboards(self, bitboards: np.ndarray, out: np.ndarray, **_: dict) -> np.ndarray:
+        out[...] = get_unified_valued_bitboard_batch(bitboards, **_)
+        return out
@@ -0,0 +1,114 @@
+"""On-disk store of fixed size features that is read through `np.memmap`.
+
+A store file starts with a header describing the fields (name, shape and dtype), followed by a
+contiguous body of records, one per position, each holding all fields. The number of records
+follows from the file size, so appending only writes to the end of the file.
+"""
+
+import json
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+
+from .transformer import ChessTransformer
+
+MAGIC = b"CHFS"
+VERSION = 1
+# the body starts at a multiple of this
+HEADER_ALIGNMENT = 64
+
+
+class FeatureStore:
+    def __init__(self, path: str | Path) -> None:
+        """Open an existing store.
+
+        Parameters
+        ----------
+        path : str | Path
+            file of the store
+        """
+        self.path = Path(path)
+        with self.path.open("rb") as store_file:
+            magic = store_file.read(len(MAGIC))
+            if magic != MAGIC:
+                msg = f"{self.path} is not a feature store"
+                raise ValueError(msg)
+            header_size = int.from_bytes(store_file.read(4), "little")
+            header = json.loads(store_file.read(header_size))
+
+        self.fields = {field["name"]: (tuple(field["shape"]), np.dtype(field["dtype"])) for field in header["fields"]}
+        self.record_dtype = np.dtype([(name, dtype, shape) for name, (shape, dtype) in self.fields.items()])
+        self.offset = _aligned(len(MAGIC) + 4 + header_size)
+        self._records = None
+
+    @classmethod
+    def create(cls, path: str | Path, fields: dict[str, tuple[tuple[int, ...], np.dtype]]) -> "FeatureStore":
+        """Create an empty store, overwriting `path`.
+
+        Parameters
+        ----------
+        path : str | Path
+            file of the store
+        fields : dict[str, tuple[tuple[int, ...], np.dtype]]
+            shape and dtype of every field of a record
+
+        Returns
+        -------
+        FeatureStore
+            the empty store
+        """
+        header = {
+            "version": VERSION,
+            "fields": [{"name": name, "shape": list(shape), "dtype": np.dtype(dtype).str} for name, (shape, dtype) in fields.items()],
+        }
+        header = json.dumps(header).encode("utf-8")
+        prefix = MAGIC + len(header).to_bytes(4, "little") + header
+        Path(path).write_bytes(prefix.ljust(_aligned(len(prefix)), b"\0"))
+        return cls(path)
+
+    @classmethod
+    def from_transformers(cls, path: str | Path, transformers: Iterable[ChessTransformer]) -> "FeatureStore":
+        """Create an empty store with one field per transformer, named after its transformation type."""
+        return cls.create(path, {transformer.transformation_type: (transformer.extractor.shape, transformer.dtype) for transformer in transformers})
+
+    def __len__(self) -> int:
+        return (self.path.stat().st_size - self.offset) // self.record_dtype.itemsize
+
+    def __getitem__(self, key: str | int | slice | np.ndarray) -> np.ndarray:
+        """A field (by name) or records (by index), both read-only views of the file where numpy allows it."""
+        return self.records[key]
+
+    @property
+    def records(self) -> np.ndarray:
+        """All records as a read-only memory map."""
+        if self._records is None or len(self._records) != len(self):
+            if len(self) == 0:
+                return np.empty(0, dtype=self.record_dtype)
+            self._records = np.memmap(self.path, dtype=self.record_dtype, mode="r", offset=self.offset, shape=(len(self),))
+        return self._records
+
+    def append(self, **fields: np.ndarray) -> None:
+        """Append records given as one (N, *shape) array per field."""
+        if set(fields) != set(self.fields):
+            msg = f"expected the fields {sorted(self.fields)}, got {sorted(fields)}"
+            raise ValueError(msg)
+
+        lengths = {name: len(values) for name, values in fields.items()}
+        length = next(iter(lengths.values()))
+        if any(field_length != length for field_length in lengths.values()):
+            msg = f"every field needs the same number of records, got {lengths}"
+            raise ValueError(msg)
+        records = np.empty(length, dtype=self.record_dtype)
+        for name, values in fields.items():
+            records[name] = values
+            # float fields may round, integer fields must hold the values exactly
+            if records.dtype[name].base.kind in "biu" and not np.array_equal(records[name], values):
+                msg = f"'{name}' changes when stored as {records.dtype[name].base}"
+                raise ValueError(msg)
+        with self.path.open("ab") as store_file:
+            store_file.write(records.tobytes())
+
+
+def _aligned(size: int) -> int:
+    return -(-size // HEADER_ALIGNMENT) * HEADER_ALIGNMENT
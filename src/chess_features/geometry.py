@@ -0,0 +1,106 @@
+"""Square to square tables of the board geometry, built once and cached on disk.
+
+Squares are numbered as in python-chess (a1 = 0, h8 = 63) and bitboards are uint64 of the same
+layout. The tables are read from `CACHE_PATH` if it holds the current `VERSION`, else they are
+built and written there for the next import.
+"""
+
+import contextlib
+import os
+import zipfile
+from pathlib import Path
+
+import chess
+import numpy as np
+
+VERSION = 3
+CACHE_PATH = Path(__file__).with_name("geometry.npz")
+# (file, rank) step of the 8 directions, orthogonal first, the opposite of direction i is i ^ 2
+DIRECTIONS = np.array([(1, 0), (0, 1), (-1, 0), (0, -1), (1, 1), (-1, 1), (-1, -1), (1, -1)], dtype=np.int8)
+
+
+def get_direction_index(file_step: int, rank_step: int) -> int:
+    """Index in `DIRECTIONS` of a (file, rank) step."""
+    return DIRECTIONS.tolist().index([file_step, rank_step])
+
+
+def _build_tables() -> dict[str, np.ndarray]:
+    ray_squares = np.full((8, 64, 7), 64, dtype=np.int8)
+    rays = np.zeros((8, 64), dtype=np.uint64)
+    direction = np.full((64, 64), -1, dtype=np.int8)
+    between = np.zeros((64, 64), dtype=np.uint64)
+    for square in chess.SQUARES:
+        for index, (file_step, rank_step) in enumerate(DIRECTIONS.tolist()):
+            file, rank = chess.square_file(square) + file_step, chess.square_rank(square) + rank_step
+            ray = 0
+            for distance in range(7):
+                if not (0 <= file < 8 and 0 <= rank < 8):  # noqa: PLR2004
+                    break
+                target = chess.square(file, rank)
+                ray_squares[index, square, distance] = target
+                direction[square, target] = index
+                between[square, target] = ray
+                ray |= chess.BB_SQUARES[target]
+                file, rank = file + file_step, rank + rank_step
+            rays[index, square] = ray
+
+    squares = np.arange(64)[:, np.newaxis]
+    aligned = direction >= 0
+    line = rays[direction, squares] | rays[direction ^ 2, squares] | (np.uint64(1) << squares.astype(np.uint64))
+    return {
+        "version": np.array(VERSION),
+        "ray_squares": ray_squares,
+        "rays": rays,
+        "direction": direction,
+        "between": between,
+        "line": np.where(aligned, line, np.uint64(0)),
+        "knight_attacks": np.array(chess.BB_KNIGHT_ATTACKS, dtype=np.uint64),
+        "king_attacks": np.array(chess.BB_KING_ATTACKS, dtype=np.uint64),
+    }
+
+
+def load_tables(path: str | Path = CACHE_PATH) -> dict[str, np.ndarray]:
+    """The geometry tables, read from `path` if it holds the current version, else built and written to it.
+
+    Parameters
+    ----------
+    path : str | Path, optional
+        .npz cache of the tables, by default `CACHE_PATH`
+
+    Returns
+    -------
+    dict[str, np.ndarray]
+        the tables by name, see the module constants
+    """
+    path = Path(path)
+    # a missing, truncated or outdated cache is rebuilt
+    with contextlib.suppress(OSError, ValueError, KeyError, EOFError, zipfile.BadZipFile), np.load(path) as cached:
+        if cached["version"] == VERSION:
+            return {name: cached[name] for name in cached.files}
+
+    tables = _build_tables()
+    # several processes may import at once, so the cache is replaced in one step
+    temporary_path = path.with_name(f"{path.stem}.{os.getpid()}.npz")
+    with contextlib.suppress(OSError):
+        np.savez(temporary_path, **tables)
+        temporary_path.replace(path)
+    return tables
+
+
+_TABLES = load_tables()
+# (direction, square, distance - 1) squares of the ray from a square to the edge, 64 beyond the edge
+RAY_SQUARES = _TABLES["ray_squares"]
+# (direction, square) bitboard of the ray from a square to the edge, without the square
+RAYS = _TABLES["rays"]
+# (square, square) index in `DIRECTIONS` from the first to the second square, -1 if they are not aligned
+DIRECTION = _TABLES["direction"]
+# (square, square) bitboard of the squares between two aligned squares, 0 otherwise, see `chess.between`
+BETWEEN = _TABLES["between"]
+# (square, square) bitboard of the edge to edge line through two aligned squares, 0 otherwise, see `chess.ray`
+LINE = _TABLES["line"]
+# (square,) bitboards of the knight and king moves
+KNIGHT_ATTACKS = _TABLES["knight_attacks"]
+KING_ATTACKS = _TABLES["king_attacks"]
+# (square,) bitboards of the rook and bishop rays on an empty board
+ROOK_RAYS = np.bitwise_or.reduce(RAYS[:4], axis=0)
+BISHOP_RAYS = np.bitwise_or.reduce(RAYS[4:], axis=0)
@@ -0,0 +1,73 @@
+"""Encodings of a board that are kept up to date while moves are pushed and popped."""
+
+import chess
+import numpy as np
+
+from .chess_features import (
+    get_piece_bitboards,
+    get_unified_valued_bitboard_batch,
+    get_values_array,
+    to_valued_bitboard_batch,
+)
+from .neighborhood_transform import get_neighborhoods, update_neighborhoods
+
+
+class IncrementalEncoder:
+    """Wraps a board and updates its valued bitboard, unified board and neighborhoods on push and pop.
+
+    Only the squares a move changed are rewritten in the planes, and only the neighborhood entries
+    whose knight jump or ray reaches one of these squares are recomputed.
+
+    Parameters
+    ----------
+    board : chess.Board | None, optional
+        the board to wrap, by default the starting position
+    values : dict | None, optional
+        piece values, by default the values of `to_valued_bitboard`
+    clockwise : bool, optional
+        order of the neighborhoods, by default False
+    """
+
+    def __init__(self, board: chess.Board | None = None, values: dict | None = None, *, clockwise: bool = False) -> None:
+        self.board = chess.Board() if board is None else board
+        self.values = values
+        self.clockwise = clockwise
+
+        self._values_array = get_values_array(values)
+        self._signed_values_array = self._values_array.copy()
+        self._signed_values_array[6:] = -self._signed_values_array[6:]
+        self._piece_bitboards = get_piece_bitboards(self.board)
+
+        self.valued_bitboard = to_valued_bitboard_batch(self._piece_bitboards, values)
+        self.unified_bitboard = get_unified_valued_bitboard_batch(self._piece_bitboards, values)
+        self.neighborhoods = get_neighborhoods(self.unified_bitboard, clockwise=clockwise)
+
+    def push(self, move: chess.Move) -> None:
+        self.board.push(move)
+        self.update()
+
+    def push_san(self, san: str) -> chess.Move:
+        move = self.board.push_san(san)
+        self.update()
+        return move
+
+    def pop(self) -> chess.Move:
+        move = self.board.pop()
+        self.update()
+        return move
+
+    def update(self) -> None:
+        """Bring the encodings in line with the wrapped board, e.g. after it was changed directly."""
+        piece_bitboards = get_piece_bitboards(self.board)
+        changed = int(np.bitwise_or.reduce(self._piece_bitboards ^ piece_bitboards))
+        self._piece_bitboards = piece_bitboards
+        if not changed:
+            return
+
+        squares = np.array(list(chess.scan_forward(changed)))
+        y, x = 7 - squares // 8, squares % 8
+        bits = (piece_bitboards[:, np.newaxis] >> squares.astype(np.uint64)) & np.uint64(1)
+        bits = bits.astype(self._values_array.dtype)
+        self.valued_bitboard[:, y, x] = bits * self._values_array[:, np.newaxis]
+        self.unified_bitboard[y, x] = self._signed_values_array @ bits
+        update_neighborhoods(self.neighborhoods, self.unified_bitboard, y * 8 + x, clockwise=self.clockwise)
@@ -1,7 +1,12 @@
 from itertools import product
 
+import chess
 import numpy as np
 
+from .geometry import RAY_SQUARES, get_direction_index
+
+CLOCKWISE_ORDER = [0, 10, 15, 11, 16, 12, 14, 9, 13, 2, 6, 5, 7, 8, 4, 3, 1]
+
 
 def get_square(board: np.array, changing: int, steady: int, *, y_changes: bool = True) -> int:
     if y_changes:
@@ -90,5 +95,86 @@ def get_neighborhood(board: np.array, x: int, y: int, *, clockwise: bool = True)
         neighborhood.append(get_diagonal_neighbor(board, x, y, under, right))
     neighborhood = np.array(neighborhood)
     if clockwise:
-        return neighborhood[[0, 10, 15, 11, 16, 12, 14, 9, 13, 2, 6, 5, 7, 8, 4, 3, 1]]
+        return neighborhood[CLOCKWISE_ORDER]
     return neighborhood
+
+
+def _build_neighbor_indices() -> tuple[np.ndarray, np.ndarray]:
+    """Flat square indices (y * 8 + x) of the knight neighbors (64, 8) and of the rays (7 distances, 64, 8).
+
+    Rows follow `to_chess_neighborhoods` (x major), columns the order of `get_neighborhood`.
+    Squares off the board point to index 64.
+    """
+    knight_offsets = []
+    for under, right, close in product([True, False], repeat=3):
+        dy, dx = (2, 1) if close else (1, 2)
+        knight_offsets.append((dy if under else -dy, dx if right else -dx))
+
+    knight_indices = np.full((64, 8), 64)
+    ray_indices = np.full((7, 64, 8), 64)
+    for row, (x, y) in enumerate(product(range(8), repeat=2)):
+        for column, (dy, dx) in enumerate(knight_offsets):
+            if 0 <= y + dy < 8 and 0 <= x + dx < 8:  # noqa: PLR2004
+                knight_indices[row, column] = (y + dy) * 8 + x + dx
+
+        # same walk as get_file_rank_neighbor: it takes 7 - changing steps in both directions, wrapping around the board
+        for column, (down_under, along_rank) in enumerate(product([1, -1], repeat=2)):
+            changing, steady = (y, x) if along_rank == 1 else (x, y)
+            for distance in range(1, 8 - changing):
+                changed = (changing + distance * down_under) % 8
+                ray_indices[distance - 1, row, column] = changed * 8 + steady if along_rank == 1 else steady * 8 + changed
+
+        # y grows towards the first rank, and y * 8 + x is the square flipped vertically (square ^ 56)
+        for column, (dy, dx) in enumerate(product([1, -1], repeat=2), start=4):
+            squares = RAY_SQUARES[get_direction_index(dx, -dy), chess.square(x, 7 - y)]
+            ray_indices[:, row, column] = np.where(squares < 64, squares ^ 56, 64)  # noqa: PLR2004
+    return knight_indices, ray_indices
+
+
+KNIGHT_INDICES, RAY_INDICES = _build_neighbor_indices()
+CENTER_INDICES = np.array([y * 8 + x for x, y in product(range(8), repeat=2)])
+# the first 9 columns of a neighborhood are read directly: the square itself and its knight neighbors
+DIRECT_INDICES = np.concatenate((CENTER_INDICES[:, np.newaxis], KNIGHT_INDICES), axis=-1)
+CLOCKWISE_POSITIONS = np.argsort(CLOCKWISE_ORDER)
+# per square the (2, k) rows and columns of the direct and ray neighborhood entries that read it
+DIRECT_READS = [np.array(np.nonzero(np.equal(DIRECT_INDICES, square))) for square in range(64)]
+RAY_READS = [np.array(np.nonzero(np.equal(RAY_INDICES, square).any(axis=0))) for square in range(64)]
+
+
+def get_neighborhoods(board: np.array, *, clockwise: bool = True) -> np.ndarray:
+    """The (..., 64, 17) neighborhoods of all squares of (..., 8, 8) boards, see `get_neighborhood` (x major)."""
+    squares = _pad_squares(board)
+    neighborhoods = np.concatenate((squares[..., DIRECT_INDICES], _first_on_rays(squares[..., RAY_INDICES])), axis=-1)
+    if clockwise:
+        return neighborhoods[..., CLOCKWISE_ORDER]
+    return neighborhoods
+
+
+def update_neighborhoods(neighborhoods: np.ndarray, board: np.array, changed: np.ndarray, *, clockwise: bool = True) -> None:
+    """Recompute in place the (64, 17) neighborhood entries of `board` that read one of the `changed` squares (y * 8 + x)."""
+    squares = _pad_squares(board)
+    columns = CLOCKWISE_POSITIONS if clockwise else np.arange(17)
+
+    rows, direct_columns = np.concatenate([DIRECT_READS[square] for square in changed], axis=1)
+    neighborhoods[rows, columns[direct_columns]] = squares[DIRECT_INDICES[rows, direct_columns]]
+
+    rows, ray_columns = np.concatenate([RAY_READS[square] for square in changed], axis=1)
+    rays = squares[RAY_INDICES[:, rows, ray_columns]]
+    # rays without any piece have their first (zero) square selected
+    neighborhoods[rows, columns[9 + ray_columns]] = rays[np.argmax(rays != 0, axis=0), np.arange(len(rows))]
+
+
+def _pad_squares(board: np.array) -> np.ndarray:
+    """Flatten (..., 8, 8) boards to (..., 65), index 64 being an empty square off the board."""
+    board = np.asarray(board)
+    squares = board.reshape((*board.shape[:-2], 64))
+    return np.concatenate((squares, np.zeros((*squares.shape[:-1], 1), dtype=squares.dtype)), axis=-1)
+
+
+def _first_on_rays(rays: np.ndarray) -> np.ndarray:
+    """First non-zero value along the distance axis -3 of gathered rays."""
+    # walk every ray from its far end towards the square, keeping the closest piece
+    first = rays[..., -1, :, :]
+    for distance in range(rays.shape[-3] - 2, -1, -1):
+        first = np.where(rays[..., distance, :, :] != 0, rays[..., distance, :, :], first)
+    return first
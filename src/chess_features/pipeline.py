@@ -0,0 +1,81 @@
+"""Stream PGN files into fixed-size batches of features, reading one game at a time."""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+import chess.pgn
+import numpy as np
+
+from .transformer import ChessTransformer
+
+METADATA_DTYPE = np.dtype([("game", np.int64), ("ply", np.int32), ("result", np.float32)])
+# score of white, games without a result get nan
+RESULTS = {"1-0": 1.0, "0-1": 0.0, "1/2-1/2": 0.5}
+
+
+def read_games(paths: str | Path | Iterable[str | Path]) -> Iterator[chess.pgn.Game]:
+    """Yield the games of one or several PGN files in order."""
+    if isinstance(paths, str | Path):
+        paths = [paths]
+    for path in paths:
+        with Path(path).open(encoding="utf-8") as pgn_file:
+            while (game := chess.pgn.read_game(pgn_file)) is not None:
+                yield game
+
+
+def stream_features(
+    paths: str | Path | Iterable[str | Path],
+    transformer: ChessTransformer | str,
+    batch_size: int = 1024,
+    values: dict | None = None,
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Yield (features, metadata) batches for every ply of every game in the PGN files.
+
+    Only one game and one batch are held at a time, so memory does not grow with the files.
+    Every batch but the last has `batch_size` rows.
+
+    Parameters
+    ----------
+    paths : str | Path | Iterable[str | Path]
+        PGN files
+    transformer : ChessTransformer | str
+        transformer or name of the extractor, it has to produce fixed size arrays
+    batch_size : int, optional
+        positions per batch, by default 1024
+    values : dict | None, optional
+        piece values passed to the extractor, by default None
+
+    Yields
+    ------
+    tuple[np.ndarray, np.ndarray]
+        features of shape (batch_size, *extractor.shape) and metadata with `METADATA_DTYPE`
+        (game index over all files, ply of the position, result for white)
+    """
+    if isinstance(transformer, str):
+        transformer = ChessTransformer(transformer)
+
+    features, metadata, filled = None, None, 0
+    for game_index, game in enumerate(read_games(paths)):
+        encoded = transformer.transform_game(game, values=values)
+        result = RESULTS.get(game.headers.get("Result"), np.nan)
+
+        start = 0
+        while start < len(encoded):
+            if features is None:
+                features = np.empty((batch_size, *encoded.shape[1:]), dtype=encoded.dtype)
+                metadata = np.empty(batch_size, dtype=METADATA_DTYPE)
+
+            count = min(batch_size - filled, len(encoded) - start)
+            features[filled : filled + count] = encoded[start : start + count]
+            metadata["game"][filled : filled + count] = game_index
+            metadata["ply"][filled : filled + count] = np.arange(start, start + count)
+            metadata["result"][filled : filled + count] = result
+            filled += count
+            start += count
+
+            if filled == batch_size:
+                yield features, metadata
+                features, metadata, filled = None, None, 0
+
+    if filled:
+        yield features[:filled], metadata[:filled]
@@ -1,10 +1,427 @@
-import itertools
 from abc import ABC, abstractmethod
+from functools import cached_property
 
 import chess
 import numpy as np
+import numpy.typing as npt
+
+from .attacks import get_pinned_mask, get_pinned_mask_batch, get_pins, get_type_attacks_batch, popcount
+from .chess_features import bitboards_to_array, get_piece_bitboards
+from .geometry import DIRECTION, DIRECTIONS
+
+# value of pawn to king, midgame and endgame
+PIECE_VALUES = np.array([[124, 781, 825, 1276, 2538, 0], [206, 854, 915, 1380, 2682, 0]])
+# value of pawn to king without pawns, midgame and endgame
+NON_PAWN_MATERIAL_VALUES = np.array([[0, 781, 825, 1276, 2538, 0], [0, 854, 915, 1380, 2682, 0]])
+
+
+def get_material(bitboards: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Material of white minus black for (..., 12) piece bitboards with (2, 6) values of pawn to king, as (..., 2)."""
+    counts = popcount(bitboards)
+    return (counts[..., :6] - counts[..., 6:]) @ np.asarray(values).T
+
+
+# midgame non pawn material of both sides up to which the game is in the endgame and from which it is in the midgame
+ENDGAME_LIMIT = 3915
+MIDGAME_LIMIT = 15258
+# phase of the midgame, the endgame has 0
+PHASE_MIDGAME = 128
+
+
+def get_phase(bitboards: np.ndarray) -> np.ndarray:
+    """Phase of (..., 12) piece bitboards as (...,), from 0 in the endgame to `PHASE_MIDGAME` by the non pawn material."""
+    counts = popcount(bitboards)
+    non_pawn_material = np.clip((counts[..., :6] + counts[..., 6:]) @ NON_PAWN_MATERIAL_VALUES[0], ENDGAME_LIMIT, MIDGAME_LIMIT)
+    return (non_pawn_material - ENDGAME_LIMIT) * PHASE_MIDGAME // (MIDGAME_LIMIT - ENDGAME_LIMIT)
+
+
+def taper(phased: np.ndarray, phase: np.ndarray) -> np.ndarray:
+    """Blend (..., 2) midgame and endgame values by the (...,) phase of `get_phase` into (...,)."""
+    phased = np.asarray(phased)
+    return (phased[..., 0] * phase + phased[..., 1] * (PHASE_MIDGAME - phase)) / PHASE_MIDGAME
+
+
+# piece square bonus of the knight to the king from the own first rank, files a to d, midgame and endgame
+PSQT_PIECE_BONUS = np.array(
+    [
+        [
+            [
+                [-175, -92, -74, -73],
+                [-77, -41, -27, -15],
+                [-61, -17, 6, 12],
+                [-35, 8, 40, 49],
+                [-34, 13, 44, 51],
+                [-9, 22, 58, 53],
+                [-67, -27, 4, 37],
+                [-201, -83, -56, -26],
+            ],
+            [
+                [-53, -5, -8, -23],
+                [-15, 8, 19, 4],
+                [-7, 21, -5, 17],
+                [-5, 11, 25, 39],
+                [-12, 29, 22, 31],
+                [-16, 6, 1, 11],
+                [-17, -14, 5, 0],
+                [-48, 1, -14, -23],
+            ],
+            [
+                [-31, -20, -14, -5],
+                [-21, -13, -8, 6],
+                [-25, -11, -1, 3],
+                [-13, -5, -4, -6],
+                [-27, -15, -4, 3],
+                [-22, -2, 6, 12],
+                [-2, 12, 16, 18],
+                [-17, -19, -1, 9],
+            ],
+            [
+                [3, -5, -5, 4],
+                [-3, 5, 8, 12],
+                [-3, 6, 13, 7],
+                [4, 5, 9, 8],
+                [0, 14, 12, 5],
+                [-4, 10, 6, 8],
+                [-5, 6, 10, 8],
+                [-2, -2, 1, -2],
+            ],
+            [
+                [271, 327, 271, 198],
+                [278, 303, 234, 179],
+                [195, 258, 169, 120],
+                [164, 190, 138, 98],
+                [154, 179, 105, 70],
+                [123, 145, 81, 31],
+                [88, 120, 65, 33],
+                [59, 89, 45, -1],
+            ],
+        ],
+        [
+            [
+                [-96, -65, -49, -21],
+                [-67, -54, -18, 8],
+                [-40, -27, -8, 29],
+                [-35, -2, 13, 28],
+                [-45, -16, 9, 39],
+                [-51, -44, -16, 17],
+                [-69, -50, -51, 12],
+                [-100, -88, -56, -17],
+            ],
+            [
+                [-57, -30, -37, -12],
+                [-37, -13, -17, 1],
+                [-16, -1, -2, 10],
+                [-20, -6, 0, 17],
+                [-17, -1, -14, 15],
+                [-30, 6, 4, 6],
+                [-31, -20, -1, 1],
+                [-46, -42, -37, -24],
+            ],
+            [
+                [-9, -13, -10, -9],
+                [-12, -9, -1, -2],
+                [6, -8, -2, -6],
+                [-6, 1, -9, 7],
+                [-5, 8, 7, -6],
+                [6, 1, -7, 10],
+                [4, 5, 20, -5],
+                [18, 0, 19, 13],
+            ],
+            [
+                [-69, -57, -47, -26],
+                [-55, -31, -22, -4],
+                [-39, -18, -9, 3],
+                [-23, -3, 13, 24],
+                [-29, -6, 9, 21],
+                [-38, -18, -12, 1],
+                [-50, -27, -24, -8],
+                [-75, -52, -43, -36],
+            ],
+            [
+                [1, 45, 85, 76],
+                [53, 100, 133, 135],
+                [88, 130, 169, 175],
+                [103, 156, 172, 172],
+                [96, 166, 199, 199],
+                [92, 172, 184, 191],
+                [47, 121, 116, 131],
+                [11, 59, 73, 78],
+            ],
+        ],
+    ]
+)
+# pawn square bonus from the own first rank, midgame and endgame
+PSQT_PAWN_BONUS = np.array(
+    [
+        [
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [3, 3, 10, 19, 16, 19, 7, -5],
+            [-9, -15, 11, 15, 32, 22, 5, -22],
+            [-4, -23, 6, 20, 40, 17, 4, -8],
+            [13, 0, -13, 1, 11, -2, -13, 5],
+            [5, -12, -7, 22, -8, -5, -15, -8],
+            [-7, 7, -3, -13, 5, -16, 10, -8],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+        ],
+        [
+            [0, 0, 0, 0, 0, 0, 0, 0],
+            [-10, -6, 10, 0, 14, 7, -5, -19],
+            [-10, -10, -10, 4, 4, 3, -6, -4],
+            [6, -2, -8, -4, -13, -12, -10, -9],
+            [10, 5, 4, -5, -5, -5, 14, 9],
+            [28, 20, 21, 28, 30, 7, 6, 13],
+            [0, -11, 12, 21, 25, 19, 4, 7],
+            [0, 0, 0, 0, 0, 0, 0, 0],
+        ],
+    ]
+)
+
+
+def _build_psqt_tables() -> np.ndarray:
+    """(2 phases, 12 pieces, 64 squares) bonus, squares in the order of `bitboards_to_array` and black's bonus negative."""
+    piece_bonus = np.concatenate((PSQT_PIECE_BONUS, PSQT_PIECE_BONUS[..., ::-1]), axis=-1)
+    # (phase, piece, rank from the own side, file)
+    bonus = np.concatenate((PSQT_PAWN_BONUS[:, np.newaxis], piece_bonus), axis=1)
+    # the 8th rank comes first, so white's rows are reversed
+    return np.concatenate((bonus[:, :, ::-1], -bonus), axis=1).reshape((2, 12, 64)).astype(np.int32)
+
+
+PSQT_TABLES = _build_psqt_tables()
+
+
+def get_psqt(bitboards: np.ndarray) -> np.ndarray:
+    """Midgame and endgame PSQT bonus of white minus black for (..., 12) piece bitboards, as (..., 2)."""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    pieces = bitboards_to_array(bitboards).reshape((*bitboards.shape[:-1], 12 * 64))
+    return pieces @ PSQT_TABLES.reshape((2, 12 * 64)).T
+
+
+# bonus by the number of safe squares of knights, bishops, rooks and queens, midgame and endgame
+MOBILITY_BONUS = [
+    [
+        [-62, -53, -12, -4, 3, 13, 22, 28, 33],
+        [-48, -20, 16, 26, 38, 51, 55, 63, 63, 68, 81, 81, 91, 98],
+        [-60, -20, 2, 3, 3, 11, 22, 31, 40, 40, 41, 48, 57, 57, 62],
+        [-30, -12, -8, -9, 20, 23, 23, 35, 38, 53, 64, 65, 65, 66, 67, 67, 72, 72, 77, 79, 93, 108, 108, 108, 110, 114, 114, 116],
+    ],
+    [
+        [-81, -56, -31, -16, 5, 11, 17, 20, 25],
+        [-59, -23, -3, 13, 24, 42, 54, 57, 65, 73, 78, 86, 88, 97],
+        [-78, -17, 23, 39, 70, 99, 103, 121, 134, 139, 158, 164, 168, 169, 172],
+        [-48, -30, -7, 19, 40, 55, 59, 75, 78, 96, 96, 100, 121, 127, 131, 133, 136, 141, 147, 150, 151, 168, 168, 171, 182, 182, 192, 219],
+    ],
+]
+# (piece, safe squares, phase) bonus, padded with zeros
+_MOBILITY_TABLE = np.zeros((4, 28, 2), dtype=np.int32)
+for _phase, _phase_bonus in enumerate(MOBILITY_BONUS):
+    for _piece, _piece_bonus in enumerate(_phase_bonus):
+        _MOBILITY_TABLE[_piece, : len(_piece_bonus), _phase] = _piece_bonus
+_LOW_RANKS = np.uint64(chess.BB_RANK_1 | chess.BB_RANK_2 | chess.BB_RANK_3)
+
+
+def get_mobility_area_batch(bitboards: np.ndarray, pinned: np.ndarray) -> np.ndarray:
+    """Mobility area of white for (..., 12) piece bitboards as (...,) bitboards.
+
+    All squares but those of the white king and queens, white pawns on the first 3 ranks or blocked by a
+    white pawn, squares attacked by black pawns and the `pinned` ones (see `get_pinned_mask_batch`).
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    pawns = bitboards[..., 0]
+    excluded = bitboards[..., 4] | bitboards[..., 5] | (pawns & _LOW_RANKS) | (pawns & (pawns >> np.uint64(8))) | pinned
+    excluded |= get_type_attacks_batch(bitboards[..., 6], chess.PAWN, ~np.uint64(0), chess.BLACK)
+    return ~excluded
+
+
+def get_mobility_batch(bitboards: np.ndarray, *, color: bool = chess.WHITE) -> np.ndarray:
+    """Midgame and endgame mobility bonus of white for (..., 12) piece bitboards as (..., 2), see `ExtractMobility`."""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    mobility_area = get_mobility_area_batch(bitboards, get_pinned_mask_batch(bitboards, color))
+    pinned = get_pinned_mask_batch(bitboards, chess.WHITE)
+    empty = ~np.bitwise_or.reduce(bitboards, axis=-1)
+    queens = bitboards[..., 4]
+
+    mobility = np.zeros((*bitboards.shape[:-1], 2), dtype=np.int64)
+    for piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+        pieces = bitboards[..., piece_type - 1].copy()
+        # one piece of every board at a time, the least significant one
+        while pieces.any():
+            piece = pieces & (~pieces + np.uint64(1))
+            pieces ^= piece
+            attacks = get_type_attacks_batch(piece, piece_type, empty)
+            if piece_type in (chess.KNIGHT, chess.BISHOP):
+                attacks ^= queens
+            count = np.where(piece & pinned, 0, np.minimum(popcount(attacks & mobility_area), 27))
+            mobility += _MOBILITY_TABLE[piece_type - 2, count] * (piece != 0)[..., np.newaxis]
+    return mobility
+
+
+# shelter weakness by the distance of the file to the edge and 7 - rank of the most advanced enemy pawn
+STRENGTH_SQUARE_WEAKNESS = np.array(
+    [
+        [-6, 81, 93, 58, 39, 18, 25],
+        [-43, 61, 35, -49, -29, -11, -63],
+        [-10, 75, 23, -2, 32, 3, -45],
+        [-39, -13, -29, -52, -48, -67, -166],
+    ]
+)
+# (file, 7 - rank) weakness, an enemy pawn on the first rank (7) is not possible and reads the first column
+_STRENGTH_SQUARE_TABLE = np.concatenate((STRENGTH_SQUARE_WEAKNESS, STRENGTH_SQUARE_WEAKNESS[:, :1]), axis=1)[[0, 1, 2, 3, 3, 2, 1, 0]]
+# the 3 files around every file, shifted to stay on the board
+_SHELTER_FILES = np.clip(np.arange(8), 1, 6)[:, np.newaxis] + np.arange(-1, 2)
+
+
+def get_strength_square_grid(own_pawns: np.ndarray, enemy_pawns: np.ndarray) -> np.ndarray:
+    """Strength of every square for the side of `own_pawns`, (...,) pawn bitboards to (..., 8, 8) indexed [rank][file].
+
+    The enemy pawns count up to the rank of the square, unless an own pawn stands diagonally behind
+    them (square - 9 or square - 7, wrapping around the board).
+    """
+    own_pawns = np.asarray(own_pawns, dtype=np.uint64)
+    enemy_pawns = np.asarray(enemy_pawns, dtype=np.uint64)
+    supported = _rotate_left(own_pawns, 9) | _rotate_left(own_pawns, 7)
+    us = _get_most_advanced_grid(enemy_pawns & ~supported)
+    weakness = _STRENGTH_SQUARE_TABLE[np.arange(8), us]
+    return 5 + weakness[..., _SHELTER_FILES].sum(axis=-1)
+
+
+def get_strength_square_batch(bitboards: np.ndarray, *, color: bool = chess.WHITE) -> np.ndarray:
+    """Strength square of `color` minus the one of the other side on the vertically flipped boards, see `ExtractStrengthSquare`."""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    own, enemy = (bitboards[..., 0], bitboards[..., 6]) if color else (bitboards[..., 6], bitboards[..., 0])
+    strength = get_strength_square_grid(own, enemy).sum(axis=(-2, -1))
+    return strength - get_strength_square_grid(enemy.byteswap(), own.byteswap()).sum(axis=(-2, -1))
+
+
+# storm danger by the distance of the file to the edge and 7 - rank of the most advanced own pawn
+STORM_SQUARE_UNBLOCKED = np.array(
+    [
+        [85, -289, -166, 97, 50, 45, 50],
+        [46, -25, 122, 45, 37, -10, 20],
+        [-6, 51, 168, 34, -2, -22, -14],
+        [-15, -11, 101, 4, 11, -15, -29],
+    ]
+)
+# storm danger of an own pawn blocked by an enemy pawn, by 7 - rank of the own pawn, midgame and endgame
+STORM_SQUARE_BLOCKED = np.array([[0, 0, 76, -10, -7, -4, -1], [0, 0, 78, 15, 10, 6, 2]])
+# (file, 7 - rank) danger, an own pawn on the first rank (7) reads the first column as in `_STRENGTH_SQUARE_TABLE`
+_STORM_SQUARE_TABLE = np.concatenate((STORM_SQUARE_UNBLOCKED, STORM_SQUARE_UNBLOCKED[:, :1]), axis=1)[[0, 1, 2, 3, 3, 2, 1, 0]]
+# midgame danger of a blocked pawn, padded like `_STORM_SQUARE_TABLE`
+_STORM_SQUARE_BLOCKED_TABLE = np.append(STORM_SQUARE_BLOCKED[0], 0)
+
+
+def get_storm_square_grid(own_pawns: np.ndarray, enemy_pawns: np.ndarray) -> np.ndarray:
+    """Midgame storm square of every square for the side of `own_pawns`, (...,) pawn bitboards to (..., 8, 8) indexed [rank][file].
+
+    The most advanced own pawn up to the rank of the square is blocked if the most advanced enemy pawn
+    of `get_strength_square_grid` stands right in front of it. Unlike there, the own pawns diagonally
+    behind the enemy pawns do not wrap around the board.
+    """
+    own_pawns = np.asarray(own_pawns, dtype=np.uint64)
+    enemy_pawns = np.asarray(enemy_pawns, dtype=np.uint64)
+    # the own pawns are always taken to move up the board
+    supported = get_type_attacks_batch(own_pawns, chess.PAWN, ~own_pawns, color=chess.WHITE)
+    us = _get_most_advanced_grid(enemy_pawns & ~supported)
+    them = _get_most_advanced_grid(own_pawns)
+    blocked = (us > 0) & (them == us + 1)
+    storm = np.where(blocked, _STORM_SQUARE_BLOCKED_TABLE[them], _STORM_SQUARE_TABLE[np.arange(8), them])
+    return storm[..., _SHELTER_FILES].sum(axis=-1)
+
+
+def get_storm_square_batch(bitboards: np.ndarray, *, color: bool = chess.WHITE) -> np.ndarray:
+    """Storm square of `color` minus the one of the other side on the vertically flipped boards, see `ExtractStormSquare`."""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    own, enemy = (bitboards[..., 0], bitboards[..., 6]) if color else (bitboards[..., 6], bitboards[..., 0])
+    storm = get_storm_square_grid(own, enemy).sum(axis=(-2, -1))
+    return storm - get_storm_square_grid(enemy.byteswap(), own.byteswap()).sum(axis=(-2, -1))
+
+
+def _get_most_advanced_grid(pawns: np.ndarray) -> np.ndarray:
+    """7 - rank of the most advanced pawn of the file up to the rank of every square, 0 if there is none, as (..., 8, 8) [rank][file]."""
+    # [rank][file], the first rank first
+    pawns = bitboards_to_array(pawns)[..., ::-1, :]
+    most_advanced = np.maximum.accumulate(np.where(pawns, np.arange(8)[:, np.newaxis], -1), axis=-2)
+    return np.where(most_advanced >= 0, 7 - most_advanced, 0)
+
+
+def _rotate_left(bb: np.ndarray, shift: int) -> np.ndarray:
+    return (bb << np.uint64(shift)) | (bb >> np.uint64(64 - shift))
+
+
+# files of the flank of a king, by the file of the king
+PAWNLESS_FLANK_MASKS = [
+    chess.BB_FILE_A | chess.BB_FILE_B | chess.BB_FILE_C,
+    chess.BB_FILE_A | chess.BB_FILE_B | chess.BB_FILE_C | chess.BB_FILE_D,
+    chess.BB_FILE_A | chess.BB_FILE_B | chess.BB_FILE_C | chess.BB_FILE_D,
+    chess.BB_FILE_C | chess.BB_FILE_D | chess.BB_FILE_E | chess.BB_FILE_F,
+    chess.BB_FILE_C | chess.BB_FILE_D | chess.BB_FILE_E | chess.BB_FILE_F,
+    chess.BB_FILE_E | chess.BB_FILE_F | chess.BB_FILE_G | chess.BB_FILE_H,
+    chess.BB_FILE_E | chess.BB_FILE_F | chess.BB_FILE_G | chess.BB_FILE_H,
+    chess.BB_FILE_F | chess.BB_FILE_G | chess.BB_FILE_H,
+]
+# flank mask by the files of a king folded into one byte, boards without a king have no flank
+_PAWNLESS_FLANK_TABLE = np.zeros(256, dtype=np.uint64)
+_PAWNLESS_FLANK_TABLE[1 << np.arange(8)] = PAWNLESS_FLANK_MASKS
+
+
+def get_pawnless_flank_batch(bitboards: np.ndarray, *, color: bool) -> np.ndarray:
+    """1 where the king of `color` is on a flank without pawns for (..., 12) piece bitboards, as (...,)."""
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    pawns = bitboards[..., 0] | bitboards[..., 6]
+    king = bitboards[..., 5 if color else 11]
+    # fold the ranks onto the first one
+    for shift in (32, 16, 8):
+        king = king | (king >> np.uint64(shift))
+    flank = _PAWNLESS_FLANK_TABLE[king & np.uint64(0xFF)]
+    return ((flank != 0) & ((pawns & flank) == 0)).astype(np.int64)
+
+
+class BoardAnalysis:
+    """Piece bitboards, pins and mobility areas of one position, computed once on first use.
+
+    Pass the same analysis to every feature of a position to share this work between them.
+    """
+
+    def __init__(self, board: chess.Board) -> None:
+        self.board = board
+        self._pinned = {}
+        self._pinned_mask = {}
+        self._mobility_area = {}
+
+    @cached_property
+    def piece_bitboards(self) -> np.ndarray:
+        """See `get_piece_bitboards`."""
+        return get_piece_bitboards(self.board)
+
+    @cached_property
+    def mirrored(self) -> "BoardAnalysis":
+        """Analysis of the mirrored board, colours swapped."""
+        return BoardAnalysis(self.board.mirror())
+
+    def pinned(self, *, color: bool) -> list[tuple[int, int]]:
+        """See `ExtractMobilityArea.get_pinned`."""
+        if color not in self._pinned:
+            self._pinned[color] = ExtractMobilityArea.compute_pinned(self.board, color=color)
+        return self._pinned[color]
+
+    def pinned_mask(self, *, color: bool) -> int:
+        """Bitboard of the squares pinned to the king of `color`, see `get_pinned_mask`."""
+        if color not in self._pinned_mask:
+            self._pinned_mask[color] = get_pinned_mask(self.board, color)
+        return self._pinned_mask[color]
 
-from .chess_features import get_unified_valued_bitboard, to_valued_attack_map
+    def mobility_area_mask(self, *, color: bool) -> int:
+        """Bitboard of the mobility area, see `get_mobility_area_batch`."""
+        if color not in self._mobility_area:
+            self._mobility_area[color] = int(get_mobility_area_batch(self.piece_bitboards, self.pinned_mask(color=color)))
+        return self._mobility_area[color]
+
+    def mobility_area(self, *, color: bool) -> np.ndarray:
+        """See `ExtractMobilityArea.get_mobility_area`."""
+        return bitboards_to_array(self.mobility_area_mask(color=color)).astype(int)
+
+
+# features of the stockfish representation in order
+STOCKFISH_FEATURES = ["NonPawnMaterial", "PieceValue", "Psqt", "MobilityArea", "Mobility", "PawnlessFlank", "StrengthSquare", "StormSquare"]
 
 
 class FeatureExtractionFactory:
@@ -17,285 +434,226 @@ class FeatureExtractionFactory:
             map_[subclass.__name__.replace("Extract", "")] = subclass
         return map_
 
+    def get_vector_names(self, feature_names: list[str] | None = None) -> list[str]:
+        """Names of the entries of `extract`, phased features get a "_mg" and an "_eg" entry."""
+        names = []
+        for feature_name in STOCKFISH_FEATURES if feature_names is None else feature_names:
+            if self._feature_extraction_map[feature_name].phased:
+                names += [f"{feature_name}_mg", f"{feature_name}_eg"]
+            else:
+                names.append(feature_name)
+        return names
+
+    def extract(
+        self,
+        board: chess.Board,
+        feature_names: list[str] | None = None,
+        *,
+        color: bool = chess.WHITE,
+        analysis: BoardAnalysis | None = None,
+    ) -> list[float]:
+        """Evaluate the features on one shared analysis of the board, see `get_vector_names` for the order.
+
+        Parameters
+        ----------
+        board : chess.Board
+            the board
+        feature_names : list[str] | None, optional
+            features to evaluate, by default STOCKFISH_FEATURES
+        color : bool, optional
+            side the features are evaluated for, by default chess.WHITE
+        analysis : BoardAnalysis | None, optional
+            analysis of the board to reuse, by default a new one
+
+        Returns
+        -------
+        list[float]
+            one value per non phased feature, a midgame and an endgame value per phased feature
+        """
+        analysis = BoardAnalysis(board) if analysis is None else analysis
+        vector = []
+        for feature_name in STOCKFISH_FEATURES if feature_names is None else feature_names:
+            feature = self._feature_extraction_map[feature_name](board, color=color, analysis=analysis)
+            if feature.phased:
+                vector += list(feature.extract_phases())
+            else:
+                vector.append(feature.extract_feature())
+        return vector
+
+
+def to_stockfish_representation(board: chess.Board, feature_names: list[str] | None = None, *, dtype: npt.DTypeLike = None) -> np.ndarray:
+    """The stockfish features of a board as a vector of `dtype` (float32 by default), see `FeatureExtractionFactory.extract`."""
+    return _cast_features(np.array(FeatureExtractionFactory().extract(board, feature_names)), dtype)
+
+
+def to_stockfish_representation_batch(
+    bitboards: np.ndarray,
+    feature_names: list[str] | None = None,
+    *,
+    color: bool = chess.WHITE,
+    dtype: npt.DTypeLike = None,
+) -> np.ndarray:
+    """The stockfish features of (N, 12) piece bitboards as (N, F), a column per entry of `FeatureExtractionFactory.get_vector_names`.
+
+    Every feature is computed for all boards at once, no board or feature object is created.
+
+    Parameters
+    ----------
+    bitboards : np.ndarray
+        (N, 12) piece bitboards, see `get_piece_bitboards_batch`
+    feature_names : list[str] | None, optional
+        features to evaluate, by default STOCKFISH_FEATURES
+    color : bool, optional
+        side the features are evaluated for, by default chess.WHITE
+    dtype : npt.DTypeLike, optional
+        type of the matrix, by default float32
+
+    Returns
+    -------
+    np.ndarray
+        the (N, F) feature matrix
+
+    Raises
+    ------
+    ValueError
+        if an integer `dtype` cannot hold the features
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64).reshape((-1, 12))
+    columns = []
+    for feature_name in STOCKFISH_FEATURES if feature_names is None else feature_names:
+        if feature_name not in _BATCH_FEATURES:
+            msg = f"'{feature_name}' has no batch implementation"
+            raise ValueError(msg)
+        column = _BATCH_FEATURES[feature_name](bitboards, color=color)
+        columns.append(column.reshape((len(bitboards), -1)))
+    return _cast_features(np.concatenate(columns, axis=-1), dtype)
+
+
+def _cast_features(features: np.ndarray, dtype: npt.DTypeLike) -> np.ndarray:
+    """`features` as `dtype` (float32 by default), a ValueError if an integer `dtype` would change them."""
+    dtype = np.dtype(np.float32 if dtype is None else dtype)
+    with np.errstate(invalid="ignore"):
+        cast = features.astype(dtype)
+    if dtype.kind in "biu" and not np.array_equal(cast, features):
+        msg = f"features from {features.min()} to {features.max()} do not fit {dtype}"
+        raise ValueError(msg)
+    return cast
+
+
+def get_tapered_evaluation_batch(bitboards: np.ndarray) -> np.ndarray:
+    """Evaluation of white for (..., 12) piece bitboards as (...,).
+
+    Piece value, PSQT and mobility of white minus black, blended from midgame to endgame by `get_phase`.
+    """
+    bitboards = np.asarray(bitboards, dtype=np.uint64)
+    mobility = get_mobility_batch(bitboards) - get_mobility_batch(_mirror_bitboards(bitboards))
+    return taper(get_material(bitboards, PIECE_VALUES) + get_psqt(bitboards) + mobility, get_phase(bitboards))
+
+
+def get_tapered_evaluation(board: chess.Board) -> float:
+    """See `get_tapered_evaluation_batch`."""
+    return float(get_tapered_evaluation_batch(get_piece_bitboards(board)))
+
+
+def _mirror_bitboards(bitboards: np.ndarray) -> np.ndarray:
+    """(..., 12) piece bitboards of the boards flipped vertically with the colours swapped, see `chess.Board.mirror`."""
+    return np.concatenate((bitboards[..., 6:], bitboards[..., :6]), axis=-1).byteswap()
+
+
+def _get_mobility_area_difference_batch(bitboards: np.ndarray, *, color: bool) -> np.ndarray:
+    """See `ExtractMobilityArea`."""
+    mirrored = _mirror_bitboards(bitboards)
+    own = get_mobility_area_batch(bitboards, get_pinned_mask_batch(bitboards, color))
+    opponent = get_mobility_area_batch(mirrored, get_pinned_mask_batch(mirrored, color))
+    return popcount(own) - popcount(opponent)
+
+
+# batch form of every feature, from (N, 12) piece bitboards and a keyword color to (N,) or (N, 2) midgame and endgame values
+_BATCH_FEATURES = {
+    "NonPawnMaterial": lambda bitboards, **_: get_material(bitboards, NON_PAWN_MATERIAL_VALUES),
+    "PieceValue": lambda bitboards, **_: get_material(bitboards, PIECE_VALUES),
+    "Psqt": lambda bitboards, **_: get_psqt(bitboards),
+    "MobilityArea": _get_mobility_area_difference_batch,
+    "Mobility": lambda bitboards, color: get_mobility_batch(bitboards, color=color),
+    "PawnlessFlank": lambda bitboards, **_: (
+        get_pawnless_flank_batch(bitboards, color=chess.BLACK) - get_pawnless_flank_batch(bitboards, color=chess.WHITE)
+    ),
+    "StrengthSquare": lambda bitboards, color: get_strength_square_batch(bitboards, color=color),
+    "StormSquare": lambda bitboards, color: get_storm_square_batch(bitboards, color=color),
+}
+
 
 class AbstractFeature(ABC):
+    # whether the feature has different midgame and endgame values
+    phased: bool = False
+
     def __init__(
         self,
         board: chess.Board,
         *,
         is_midgame: bool | None = None,
         color: bool = chess.WHITE,
+        analysis: BoardAnalysis | None = None,
     ) -> None:
         self.board = board
         self.is_midgame = is_midgame
         self.color = chess.WHITE if color is None else color
+        self.analysis = BoardAnalysis(board) if analysis is None else analysis
 
     @abstractmethod
     def extract_feature(self, board: chess.Board, *, is_midgame: bool, color: bool) -> float | int:
         pass
 
+    def extract_phases(self) -> np.ndarray:
+        """Midgame and endgame value of a phased feature as (2,), computed together."""
+        raise NotImplementedError
 
-class ExtractNonPawnMaterial(AbstractFeature):
-    def __init__(
-        self,
-        board: chess.Board,
-        *,
-        is_midgame: bool | None = None,
-        color: bool = chess.WHITE,
-    ) -> None:
-        super().__init__(board, is_midgame=is_midgame, color=color)
 
-        self.values = [0, 781, 825, 1276, 2538] if self.is_midgame else [0, 854, 915, 1380, 2682]
+class ExtractNonPawnMaterial(AbstractFeature):
+    phased = True
 
     def extract_feature(self) -> float:
-        values = dict(
-            zip(
-                ["pawn", "knight", "bishop", "rook", "queen", "king"],
-                [*self.values, 0],
-                strict=False,
-            )
-        )
-        return np.sum(get_unified_valued_bitboard(self.board, values=values))
+        return self.extract_phases()[0 if self.is_midgame else 1]
 
+    def extract_phases(self) -> np.ndarray:
+        return get_material(self.analysis.piece_bitboards, NON_PAWN_MATERIAL_VALUES)
 
-class ExtractPieceValue(AbstractFeature):
-    def __init__(
-        self,
-        board: chess.Board,
-        *,
-        is_midgame: bool | None = None,
-        color: bool = chess.WHITE,
-    ) -> None:
-        super().__init__(board, is_midgame=is_midgame, color=color)
 
-        self.piece_values = [124, 781, 825, 1276, 2538] if self.is_midgame else [206, 854, 915, 1380, 2682]
+class ExtractPieceValue(AbstractFeature):
+    phased = True
 
     def extract_feature(self) -> int:
-        values = dict(
-            zip(
-                ["pawn", "knight", "bishop", "rook", "queen", "king"],
-                [*self.piece_values, 0],
-                strict=False,
-            )
-        )
-        return np.sum(get_unified_valued_bitboard(self.board, values=values))
+        return self.extract_phases()[0 if self.is_midgame else 1]
+
+    def extract_phases(self) -> np.ndarray:
+        return get_material(self.analysis.piece_bitboards, PIECE_VALUES)
 
 
 class ExtractPsqt(AbstractFeature):
-    def __init__(
-        self,
-        board: chess.Board,
-        *,
-        is_midgame: bool | None = None,
-        color: bool = chess.WHITE,
-    ) -> None:
-        super().__init__(board, is_midgame=is_midgame, color=color)
-        if self.is_midgame:
-            self.piece_bonus = np.array(
-                [
-                    [
-                        [-175, -92, -74, -73],
-                        [-77, -41, -27, -15],
-                        [-61, -17, 6, 12],
-                        [-35, 8, 40, 49],
-                        [-34, 13, 44, 51],
-                        [-9, 22, 58, 53],
-                        [-67, -27, 4, 37],
-                        [-201, -83, -56, -26],
-                    ],
-                    [
-                        [-53, -5, -8, -23],
-                        [-15, 8, 19, 4],
-                        [-7, 21, -5, 17],
-                        [-5, 11, 25, 39],
-                        [-12, 29, 22, 31],
-                        [-16, 6, 1, 11],
-                        [-17, -14, 5, 0],
-                        [-48, 1, -14, -23],
-                    ],
-                    [
-                        [-31, -20, -14, -5],
-                        [-21, -13, -8, 6],
-                        [-25, -11, -1, 3],
-                        [-13, -5, -4, -6],
-                        [-27, -15, -4, 3],
-                        [-22, -2, 6, 12],
-                        [-2, 12, 16, 18],
-                        [-17, -19, -1, 9],
-                    ],
-                    [
-                        [3, -5, -5, 4],
-                        [-3, 5, 8, 12],
-                        [-3, 6, 13, 7],
-                        [4, 5, 9, 8],
-                        [0, 14, 12, 5],
-                        [-4, 10, 6, 8],
-                        [-5, 6, 10, 8],
-                        [-2, -2, 1, -2],
-                    ],
-                    [
-                        [271, 327, 271, 198],
-                        [278, 303, 234, 179],
-                        [195, 258, 169, 120],
-                        [164, 190, 138, 98],
-                        [154, 179, 105, 70],
-                        [123, 145, 81, 31],
-                        [88, 120, 65, 33],
-                        [59, 89, 45, -1],
-                    ],
-                ]
-            )
-            self.pawn_bonus = np.array(
-                [
-                    [0, 0, 0, 0, 0, 0, 0, 0],
-                    [3, 3, 10, 19, 16, 19, 7, -5],
-                    [-9, -15, 11, 15, 32, 22, 5, -22],
-                    [-4, -23, 6, 20, 40, 17, 4, -8],
-                    [13, 0, -13, 1, 11, -2, -13, 5],
-                    [5, -12, -7, 22, -8, -5, -15, -8],
-                    [-7, 7, -3, -13, 5, -16, 10, -8],
-                    [0, 0, 0, 0, 0, 0, 0, 0],
-                ]
-            )
-        else:
-            self.piece_bonus = np.array(
-                [
-                    [
-                        [-96, -65, -49, -21],
-                        [-67, -54, -18, 8],
-                        [-40, -27, -8, 29],
-                        [-35, -2, 13, 28],
-                        [-45, -16, 9, 39],
-                        [-51, -44, -16, 17],
-                        [-69, -50, -51, 12],
-                        [-100, -88, -56, -17],
-                    ],
-                    [
-                        [-57, -30, -37, -12],
-                        [-37, -13, -17, 1],
-                        [-16, -1, -2, 10],
-                        [-20, -6, 0, 17],
-                        [-17, -1, -14, 15],
-                        [-30, 6, 4, 6],
-                        [-31, -20, -1, 1],
-                        [-46, -42, -37, -24],
-                    ],
-                    [
-                        [-9, -13, -10, -9],
-                        [-12, -9, -1, -2],
-                        [6, -8, -2, -6],
-                        [-6, 1, -9, 7],
-                        [-5, 8, 7, -6],
-                        [6, 1, -7, 10],
-                        [4, 5, 20, -5],
-                        [18, 0, 19, 13],
-                    ],
-                    [
-                        [-69, -57, -47, -26],
-                        [-55, -31, -22, -4],
-                        [-39, -18, -9, 3],
-                        [-23, -3, 13, 24],
-                        [-29, -6, 9, 21],
-                        [-38, -18, -12, 1],
-                        [-50, -27, -24, -8],
-                        [-75, -52, -43, -36],
-                    ],
-                    [
-                        [1, 45, 85, 76],
-                        [53, 100, 133, 135],
-                        [88, 130, 169, 175],
-                        [103, 156, 172, 172],
-                        [96, 166, 199, 199],
-                        [92, 172, 184, 191],
-                        [47, 121, 116, 131],
-                        [11, 59, 73, 78],
-                    ],
-                ]
-            )
-            self.pawn_bonus = np.array(
-                [
-                    [0, 0, 0, 0, 0, 0, 0, 0],
-                    [-10, -6, 10, 0, 14, 7, -5, -19],
-                    [-10, -10, -10, 4, 4, 3, -6, -4],
-                    [6, -2, -8, -4, -13, -12, -10, -9],
-                    [10, 5, 4, -5, -5, -5, 14, 9],
-                    [28, 20, 21, 28, 30, 7, 6, 13],
-                    [0, -11, 12, 21, 25, 19, 4, 7],
-                    [0, 0, 0, 0, 0, 0, 0, 0],
-                ]
-            )
+    phased = True
 
     def extract_feature(self) -> float:
-        piece_map = np.append(self.piece_bonus, np.flip(self.piece_bonus, -1), axis=2)
-
-        opponent_piece_map = np.append(np.expand_dims(self.pawn_bonus, 0), piece_map, axis=0)
-        own_piece_map = np.flip(opponent_piece_map, axis=1)
-
-        values = dict(
-            zip(
-                ["pawn", "knight", "bishop", "rook", "queen", "king"],
-                range(1, 7),
-                strict=False,
-            )
-        )
-        valued_board = get_unified_valued_bitboard(self.board, values)
-
-        own_piece_bonus_sum = 0
-        for i in range(1, 7):
-            current_piece_mask = valued_board == i
-            own_piece_bonus_sum += own_piece_map[i - 1][current_piece_mask].sum()
+        return self.extract_phases()[0 if self.is_midgame else 1]
 
-        opponent_piece_bonus_sum = 0
-        for i in range(-1, -7, -1):
-            current_piece_mask = valued_board == i
-            opponent_piece_bonus_sum += opponent_piece_map[abs(i) - 1][current_piece_mask].sum()
-
-        return own_piece_bonus_sum - opponent_piece_bonus_sum
+    def extract_phases(self) -> np.ndarray:
+        return get_psqt(self.analysis.piece_bitboards)
 
 
 class ExtractMobilityArea(AbstractFeature):
     def extract_feature(self) -> float:
-        own_mobility_area = self.get_mobility_area(self.board, color=self.color)
-        opponent_mobility_area = self.get_mobility_area(self.board.mirror(), color=self.color)
+        own_mobility_area = self.analysis.mobility_area(color=self.color)
+        opponent_mobility_area = self.analysis.mirrored.mobility_area(color=self.color)
         return own_mobility_area.sum() - opponent_mobility_area.sum()
 
     @classmethod
-    def get_mobility_area(cls, board: chess.Board, *, color: bool) -> np.ndarray:
-        values = dict(
-            zip(
-                ["pawn", "knight", "bishop", "rook", "queen", "king"],
-                range(1, 7),
-                strict=False,
-            )
-        )
-        valued_board = get_unified_valued_bitboard(board, values)
-        valued_attack_map = to_valued_attack_map(board)
-
-        mobility_area = np.ones((8, 8))
-        # own king and queen
-        mobility_area -= (valued_board == 6) + (valued_board == 5)
-        # own pawns in own 3 ranks
-        mobility_area[5:] -= valued_board[5:] == 1
-        # attacked by opponent pawns
-        mobility_area -= valued_attack_map[6]
-        # own blocked pawns
-        mobility_area[1:] -= (((valued_board[:7] == 1).astype("int") + (valued_board[1:] == 1).astype("int")) > 1).astype("int")
-        # own blockers for king
-
-        pins = cls.get_pinned(board, color=color)
-        for pin in pins:
-            index, _ = pin
-            row_index = (63 - index) // 8
-            col_index = index % 8
-            mobility_area[row_index, col_index] = 0
-
-        return (mobility_area == 1).astype("int")
+    def get_mobility_area(cls, board: chess.Board, *, color: bool, analysis: BoardAnalysis | None = None) -> np.ndarray:
+        return (BoardAnalysis(board) if analysis is None else analysis).mobility_area(color=color)
 
     @classmethod
-    def get_pinned(cls, board: chess.Board, *, color: bool) -> np.ndarray:
+    def get_pinned(cls, board: chess.Board, *, color: bool, analysis: BoardAnalysis | None = None) -> list[tuple[int, int]]:
         """Get the pinned squares and the direction.
         1 - horizontal, 2 - topleft to bottomright, 3 - vertical, 4 - topright to bottomleft
-        board is bottom up, left right
+        board is bottom up, left right, `get_pinned_mask` gives the same squares as a bitboard
 
         Parameters
         ----------
@@ -307,134 +665,48 @@ class ExtractMobilityArea(AbstractFeature):
         list
             contains tuples with (square index, direction)
         """
-        result = []
+        return (BoardAnalysis(board) if analysis is None else analysis).pinned(color=color)
 
-        for i in chess.SQUARES:
-            if len(a := board.pin(color, i)) < 64:
-                mask = np.array(a.tolist())
-                if i < 8:
-                    if mask[i + 8]:
-                        result.append((i, 3))  # vertical
-                    elif mask[i + 7]:
-                        result.append((i, 2))  # topleft to bottomright
-
-                    elif mask[i + 9]:
-                        result.append((i, 4))  # topright to bottomleft
-                elif mask[i - 8]:
-                    result.append((i, 3))  # vertical
-                elif mask[i - 9]:
-                    result.append((i, 4))  # topright to bottomleft
-                elif mask[i - 7]:
-                    result.append((i, 2))  # topleft to bottomright
-
-                if (i % 8) < 1:
-                    if mask[i + 1]:
-                        result.append((i, 1))  # horizontal
-                elif mask[i - 1]:
-                    result.append((i, 8))  # horizontal
-        return result
+    @classmethod
+    def compute_pinned(cls, board: chess.Board, *, color: bool) -> list[tuple[int, int]]:
+        king = board.king(color)
+        result = []
+        for sniper, pinned in get_pins(board, color):
+            file_step, rank_step = DIRECTIONS[DIRECTION[king, sniper]]
+            if rank_step == 0:
+                direction = 1  # horizontal
+            elif file_step == 0:
+                direction = 3  # vertical
+            elif (file_step > 0) == (rank_step > 0):
+                direction = 4  # topright to bottomleft
+            else:
+                direction = 2  # topleft to bottomright
+            result += [(square, direction) for square in chess.scan_forward(pinned)]
+        return sorted(result)
 
 
 class ExtractMobility(AbstractFeature):
-    def __init__(
-        self,
-        board: chess.Board,
-        *,
-        is_midgame: bool | None = None,
-        color: bool = chess.WHITE,
-    ) -> None:
-        super().__init__(board, is_midgame=is_midgame, color=color)
-
-        if self.is_midgame:
-            self.bonus = [
-                [-62, -53, -12, -4, 3, 13, 22, 28, 33],
-                [-48, -20, 16, 26, 38, 51, 55, 63, 63, 68, 81, 81, 91, 98],
-                [-60, -20, 2, 3, 3, 11, 22, 31, 40, 40, 41, 48, 57, 57, 62],
-                [
-                    -30,
-                    -12,
-                    -8,
-                    -9,
-                    20,
-                    23,
-                    23,
-                    35,
-                    38,
-                    53,
-                    64,
-                    65,
-                    65,
-                    66,
-                    67,
-                    67,
-                    72,
-                    72,
-                    77,
-                    79,
-                    93,
-                    108,
-                    108,
-                    108,
-                    110,
-                    114,
-                    114,
-                    116,
-                ],
-            ]
-        else:
-            self.bonus = [
-                [-81, -56, -31, -16, 5, 11, 17, 20, 25],
-                [-59, -23, -3, 13, 24, 42, 54, 57, 65, 73, 78, 86, 88, 97],
-                [-78, -17, 23, 39, 70, 99, 103, 121, 134, 139, 158, 164, 168, 169, 172],
-                [
-                    -48,
-                    -30,
-                    -7,
-                    19,
-                    40,
-                    55,
-                    59,
-                    75,
-                    78,
-                    96,
-                    96,
-                    100,
-                    121,
-                    127,
-                    131,
-                    133,
-                    136,
-                    141,
-                    147,
-                    150,
-                    151,
-                    168,
-                    168,
-                    171,
-                    182,
-                    182,
-                    192,
-                    219,
-                ],
-            ]
+    phased = True
 
     def extract_feature(self) -> float:
-        mobility_area = ExtractMobilityArea.get_mobility_area(self.board, color=self.color)[::-1].reshape(-1)
-        mob = []
-        for square in range(64):
-            if self.board.color_at(square) == chess.WHITE and self.board.piece_type_at(square) not in [None, 1, 6]:
-                if not self.board.is_pinned(chess.WHITE, square):
-                    t = self.board.attacks(square)
-                    if self.board.piece_type_at(square) in [2, 3]:
-                        t = t ^ self.board.pieces(5, chess.WHITE)
-                    t = t.tolist() & mobility_area.astype("bool")
-                    mob.append((square, self.board.piece_type_at(square), sum(t.tolist())))
-                else:
-                    mob.append((square, self.board.piece_type_at(square), 0))
-        all_ = 0
-        for _, ind, val in mob:
-            all_ += self.bonus[ind - 2][val]
-        return all_
+        return self.extract_phases()[0 if self.is_midgame else 1]
+
+    def extract_phases(self) -> np.ndarray:
+        mobility_area = self.analysis.mobility_area_mask(color=self.color)
+        pinned = self.analysis.pinned_mask(color=chess.WHITE)
+        queens = self.board.pieces_mask(chess.QUEEN, chess.WHITE)
+
+        mobility = np.zeros(2, dtype=np.int64)
+        for piece_type in (chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+            for square in chess.scan_forward(self.board.pieces_mask(piece_type, chess.WHITE)):
+                count = 0
+                if not pinned & chess.BB_SQUARES[square]:
+                    attacks = self.board.attacks_mask(square)
+                    if piece_type in (chess.KNIGHT, chess.BISHOP):
+                        attacks ^= queens
+                    count = (attacks & mobility_area).bit_count()
+                mobility += _MOBILITY_TABLE[piece_type - 2, count]
+        return mobility
 
 
 class ExtractPawnlessFlank(AbstractFeature):
@@ -458,69 +730,31 @@ class ExtractPawnlessFlank(AbstractFeature):
 
         Parameters
         ----------
-        board : chess.Board
-            position
-        color : bool, optional
-            _description_, by default chess.WHITE
+        color : bool
+            side of the king
 
         Returns
         -------
-        _type_
-            _description_
+        int
+            1 if there is no pawn of either side on the files of the king's flank, else 0, 0 without a king
         """
-        pawn_columns = np.zeros((8, 1))
-        for i in range(64):
-            if self.board.piece_type_at(i) == 1:
-                pawn_columns[i % 8] += 1
-            elif self.board.piece_type_at(i) == 6 and self.board.color_at(i) == color:
-                king_column = i % 8
-        if king_column == 0:
-            pawn_sum = pawn_columns[0] + pawn_columns[1] + pawn_columns[2]
-        elif king_column < 3:
-            pawn_sum = pawn_columns[0] + pawn_columns[1] + pawn_columns[2] + pawn_columns[3]
-        elif king_column < 5:
-            pawn_sum = pawn_columns[2] + pawn_columns[3] + pawn_columns[4] + pawn_columns[5]
-        elif king_column < 7:
-            pawn_sum = pawn_columns[4] + pawn_columns[5] + pawn_columns[6] + pawn_columns[7]
-        else:
-            pawn_sum = pawn_columns[5] + pawn_columns[6] + pawn_columns[7]
-
-        return 1 if pawn_sum == 0 else 0
+        king = self.board.king(color)
+        if king is None:
+            return 0
+        return int(not self.board.pawns & PAWNLESS_FLANK_MASKS[chess.square_file(king)])
 
 
 class ExtractStrengthSquare(AbstractFeature):
     def extract_feature(self) -> float:
-        flipped_board = self.board.transform(chess.flip_vertical)
-        return self.get_strength_square(self.board, color=self.color) - self.get_strength_square(flipped_board, color=(not self.color))
+        return get_strength_square_batch(self.analysis.piece_bitboards, color=self.color)
 
     def get_strength_square(self, board: chess.Board, *, color: bool) -> float:
-        debug = np.zeros((8, 8))
-
-        for square_x, square_y in itertools.product(range(8), repeat=2):
-            v = 5
-            kx = min(6, max(1, square_x))
-            weakness = [
-                [-6, 81, 93, 58, 39, 18, 25],
-                [-43, 61, 35, -49, -29, -11, -63],
-                [-10, 75, 23, -2, 32, 3, -45],
-                [-39, -13, -29, -52, -48, -67, -166],
-            ]
-            for x_ in range(kx - 1, kx + 2):
-                us = 0
-                for y in range(square_y + 1):
-                    if (
-                        (board.piece_type_at((x_) + y * 8) == 1 and board.color_at((x_) + y * 8) == (not color))
-                        and not (board.piece_type_at((x_ - 1) + (y - 1) * 8) == 1 and board.color_at((x_ - 1) + (y - 1) * 8) == color)
-                        and not (board.piece_type_at((x_ + 1) + (y - 1) * 8) == 1 and board.color_at((x_ + 1) + (y - 1) * 8) == color)
-                    ):
-                        us = 7 - y
-                f = min(x_, 7 - x_)
-                v += weakness[f][us]
-            debug[square_y][square_x] = v
-
-        return debug.sum()
+        return get_strength_square_grid(board.pawns & board.occupied_co[color], board.pawns & board.occupied_co[not color]).sum()
 
 
 class ExtractStormSquare(AbstractFeature):
-    def extract_feature(self, board: chess.Board, *, is_midgame: bool, color: bool) -> float:
-        raise NotImplementedError
+    def extract_feature(self) -> float:
+        return get_storm_square_batch(self.analysis.piece_bitboards, color=self.color)
+
+    def get_storm_square(self, board: chess.Board, *, color: bool) -> float:
+        return get_storm_square_grid(board.pawns & board.occupied_co[color], board.pawns & board.occupied_co[not color]).sum()
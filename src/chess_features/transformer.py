@@ -1,19 +1,180 @@
+from collections.abc import Callable, Iterable, Sequence
+
 import chess
+import chess.pgn
 import numpy as np
+import numpy.typing as npt
 
+from .cache import CacheInfo, FeatureCache
+from .chess_features import get_piece_bitboards
 from .extractor_factory import ExtractorFactory
 
 
 class ChessTransformer:
-    def __init__(self, transformation_type: str) -> None:
+    def __init__(self, transformation_type: str, dtype: npt.DTypeLike = None, cache_size: int = 0) -> None:
+        """Create a transformer for one extractor.
+
+        Parameters
+        ----------
+        transformation_type : str
+            name of the extractor, see `get_available_transformations`
+        dtype : npt.DTypeLike, optional
+            type the arrays are computed in, by default the extractor's own `dtype`. Small types such
+            as int8 or uint8 are enough for bit planes and for integer piece values.
+        cache_size : int, optional
+            number of encoded positions kept in an LRU cache keyed by their Zobrist hash, by default 0
+            (no cache). Cached encodings are returned as read-only arrays.
+        """
         self.transformation_type = transformation_type
         self._extractor_factory = ExtractorFactory()
         self.extractor = self._extractor_factory.create(transformation_type)
+        if dtype is not None and (self.extractor.shape is None or self.extractor.packed):
+            msg = f"'{transformation_type}' does not support a dtype"
+            raise ValueError(msg)
+        self.dtype = self.extractor.dtype if dtype is None else np.dtype(dtype)
+        if cache_size and self.extractor.shape is None:
+            msg = f"'{transformation_type}' depends on more than the position and cannot be cached"
+            raise ValueError(msg)
+        self.cache = FeatureCache(cache_size) if cache_size else None
 
     def __call__(self, board: chess.Board, values: dict | None = None) -> np.ndarray:
         if isinstance(board, str):
             board = chess.Board(board)
-        return self.extractor(board, values=values)
+        if self.cache is None:
+            return self.extractor(board, values=values, dtype=self.dtype)
+
+        key = FeatureCache.key(board, self.transformation_type, values)
+        encoded = self.cache.get(key)
+        if encoded is None:
+            encoded = self.cache.put(key, self.extractor(board, values=values, dtype=self.dtype))
+        return encoded
+
+    def transform_batch(
+        self,
+        boards: Sequence[chess.Board | str],
+        out: np.ndarray | None = None,
+        values: dict | None = None,
+    ) -> np.ndarray:
+        """Encode several boards into one contiguous array.
+
+        Parameters
+        ----------
+        boards : Sequence[chess.Board | str]
+            boards or FEN strings
+        out : np.ndarray | None, optional
+            preallocated array of shape (len(boards), *extractor.shape), by default None
+        values : dict | None, optional
+            piece values passed to the extractor, by default None
+
+        Returns
+        -------
+        np.ndarray
+            the encoded boards, `out` if it was given
+        """
+        boards = [chess.Board(board) if isinstance(board, str) else board for board in boards]
+        out = self._get_output(len(boards), out)
+        if self.cache is None:
+            return self.extractor.batch(boards, out, values=values, dtype=self.dtype)
+
+        keys = [FeatureCache.key(board, self.transformation_type, values) for board in boards]
+        return self._transform_cached(
+            keys, out, lambda missing, missing_out: self.extractor.batch([boards[i] for i in missing], missing_out, values=values, dtype=self.dtype)
+        )
+
+    def transform_game(
+        self,
+        game: chess.pgn.Game | Iterable[chess.Move],
+        out: np.ndarray | None = None,
+        values: dict | None = None,
+    ) -> np.ndarray:
+        """Encode every ply of a game, replaying it once.
+
+        Row i holds the position in which the i-th move is played.
+
+        Parameters
+        ----------
+        game : chess.pgn.Game | Iterable[chess.Move]
+            a game, whose mainline is used, or moves from the starting position
+        out : np.ndarray | None, optional
+            preallocated array of shape (plies, *extractor.shape), by default None
+        values : dict | None, optional
+            piece values passed to the extractor, by default None
+
+        Returns
+        -------
+        np.ndarray
+            the encoded positions, `out` if it was given
+        """
+        if isinstance(game, chess.pgn.Game):
+            board, moves = game.board(), list(game.mainline_moves())
+        else:
+            board, moves = chess.Board(), list(game)
+        out = self._get_output(len(moves), out)
+
+        if self.cache is not None:
+            # the pieces are enough to encode a miss, only other extractors need a copy of the board
+            keys, positions = [], []
+            for move in moves:
+                keys.append(FeatureCache.key(board, self.transformation_type, values))
+                positions.append(get_piece_bitboards(board) if self.extractor.from_bitboards else board.copy(stack=False))
+                board.push(move)
+            if self.extractor.from_bitboards:
+                bitboards = np.array(positions, dtype=np.uint64).reshape((-1, 12))
+                return self._transform_cached(
+                    keys,
+                    out,
+                    lambda missing, missing_out: self.extractor.batch_bitboards(bitboards[missing], missing_out, values=values, dtype=self.dtype),
+                )
+            return self._transform_cached(
+                keys,
+                out,
+                lambda missing, missing_out: self.extractor.batch([positions[i] for i in missing], missing_out, values=values, dtype=self.dtype),
+            )
+
+        if self.extractor.from_bitboards:
+            bitboards = np.empty((len(moves), 12), dtype=np.uint64)
+            for i, move in enumerate(moves):
+                bitboards[i] = get_piece_bitboards(board)
+                board.push(move)
+            return self.extractor.batch_bitboards(bitboards, out, values=values, dtype=self.dtype)
+
+        for i, move in enumerate(moves):
+            out[i] = self.extractor(board, values=values, dtype=self.dtype)
+            board.push(move)
+        return out
+
+    def cache_info(self) -> CacheInfo | None:
+        """Hits, misses, maximum and current size of the cache, None without a cache."""
+        return None if self.cache is None else self.cache.info()
+
+    def _transform_cached(self, keys: list[tuple], out: np.ndarray, encode: Callable[[list[int], np.ndarray], np.ndarray]) -> np.ndarray:
+        """Fill `out` from the cache and encode the missing rows at once with `encode(indices, out)`."""
+        missing = []
+        for i, key in enumerate(keys):
+            encoded = self.cache.get(key)
+            if encoded is None:
+                missing.append(i)
+            else:
+                out[i] = encoded
+        if missing:
+            encoded = encode(missing, self._get_output(len(missing), None))
+            out[missing] = encoded
+            for i, row in zip(missing, encoded, strict=True):
+                self.cache.put(keys[i], row)
+        return out
+
+    def _get_output(self, length: int, out: np.ndarray | None) -> np.ndarray:
+        if self.extractor.shape is None:
+            msg = f"'{self.transformation_type}' does not produce fixed size arrays"
+            raise TypeError(msg)
+
+        shape = (length, *self.extractor.shape)
+        if out is None:
+            return np.empty(shape, dtype=self.dtype)
+        if out.shape != shape:
+            msg = f"out has shape {out.shape}, expected {shape}"
+            raise ValueError(msg)
+        return out
 
     def get_available_transformations(self) -> list:
-        return list(self._extractor_factory.keys())
+        return list(self._extractor_factory.extractors.keys())
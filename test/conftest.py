@@ -0,0 +1,18 @@
+from pathlib import Path
+
+import chess
+import chess.pgn
+import pytest
+
+
+@pytest.fixture
+def fisher_game() -> chess.pgn.Game:
+    """The first game of fisher.pgn."""
+    with Path("./test/test_files/fisher.pgn").open(encoding="utf-8") as pgn_file:
+        return chess.pgn.read_game(pgn_file)
+
+
+@pytest.fixture
+def game_boards(fisher_game: chess.pgn.Game) -> list[chess.Board]:
+    """The positions of `fisher_game` from the start to after the last move."""
+    return [fisher_game.board()] + [node.board() for node in fisher_game.mainline()]
@@ -0,0 +1,43 @@
+from pathlib import Path
+
+import numpy as np
+
+from src.chess_features.dataset_builder import build_dataset, plan_shards
+from src.chess_features.pipeline import read_games
+from src.chess_features.transformer import ChessTransformer
+
+PGN_FILES = ["./test/test_files/fisher.pgn", "./test/test_files/game.pgn"]
+
+
+def write_fen_file(tmp_path: Path) -> Path:
+    fen_path = tmp_path / "positions.fen"
+    fens = [game.end().board().fen() for game in read_games(PGN_FILES)]
+    fen_path.write_text("\n".join([*fens, "", fens[0]]) + "\n", encoding="utf-8")
+    return fen_path
+
+
+def test_plan_shards(tmp_path: Path) -> None:
+    shards = plan_shards([*PGN_FILES, write_fen_file(tmp_path)], games_per_shard=1, positions_per_shard=2)
+
+    assert [shard.index for shard in shards] == [0, 1, 2, 3]
+    assert [shard.count for shard in shards] == [1, 1, 2, 1]
+    assert [shard.first for shard in shards] == [0, 1, 2, 4]
+
+
+def test_build_dataset(tmp_path: Path) -> None:
+    fen_path = write_fen_file(tmp_path)
+    transformer = ChessTransformer("bit_attack")
+
+    shard_paths = build_dataset([*PGN_FILES, fen_path], tmp_path / "dataset", "bit_attack", workers=2, positions_per_shard=2)
+
+    assert [path.name for path in shard_paths] == ["shard_00000.npz", "shard_00001.npz", "shard_00002.npz", "shard_00003.npz"]
+    shards = [np.load(path) for path in shard_paths]
+    for game_index, (shard, game) in enumerate(zip(shards, read_games(PGN_FILES), strict=False)):
+        np.testing.assert_array_equal(shard["features"], transformer.transform_game(game))
+        np.testing.assert_array_equal(shard["metadata"]["ply"], np.arange(len(shard["features"])))
+        np.testing.assert_array_equal(shard["metadata"]["game"], game_index)
+
+    fens = [line for line in fen_path.read_text(encoding="utf-8").splitlines() if line]
+    np.testing.assert_array_equal(np.concatenate([shard["features"] for shard in shards[2:]]), transformer.transform_batch(fens))
+    np.testing.assert_array_equal(shards[2]["metadata"]["game"], [2, 3])
+    np.testing.assert_array_equal(shards[3]["metadata"]["game"], [4])
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+import chess
+import numpy as np
+import pytest
+
+from src.chess_features.feature_store import FeatureStore
+from src.chess_features.pipeline import read_games
+from src.chess_features.transformer import ChessTransformer
+
+
+def test_feature_store_append_and_read(tmp_path: Path) -> None:
+    transformers = [ChessTransformer("bitboard"), ChessTransformer("valued_attack", dtype=np.int16)]
+    games = list(read_games(["./test/test_files/fisher.pgn", "./test/test_files/game.pgn"]))
+    store = FeatureStore.from_transformers(tmp_path / "games.store", transformers)
+    assert len(store) == 0
+
+    for game in games:
+        store.append(**{transformer.transformation_type: transformer.transform_game(game) for transformer in transformers})
+
+    reopened = FeatureStore(tmp_path / "games.store")
+    for transformer in transformers:
+        expected = np.concatenate([transformer.transform_game(game) for game in games])
+        assert len(reopened) == len(expected)
+        assert reopened.fields[transformer.transformation_type] == (transformer.extractor.shape, np.dtype(transformer.dtype))
+        np.testing.assert_array_equal(reopened[transformer.transformation_type], expected)
+        np.testing.assert_array_equal(reopened[5][transformer.transformation_type], expected[5])
+
+    assert isinstance(reopened.records, np.memmap)
+    assert np.shares_memory(reopened["bitboard"], reopened.records)
+    assert not reopened["bitboard"].flags.writeable
+
+
+def test_feature_store_rejects_missing_fields(tmp_path: Path) -> None:
+    store = FeatureStore.create(tmp_path / "boards.store", {"bitboard": ((12, 8, 8), np.uint8), "ply": ((), np.int32)})
+    with pytest.raises(ValueError, match="fields"):
+        store.append(bitboard=ChessTransformer("bitboard").transform_batch([chess.Board()]))
+
+
+def test_feature_store_rejects_different_lengths(tmp_path: Path) -> None:
+    store = FeatureStore.create(tmp_path / "boards.store", {"bitboard": ((12, 8, 8), np.uint8), "ply": ((), np.int32)})
+    boards = [chess.Board()] * 5
+    with pytest.raises(ValueError, match="same number of records"):
+        store.append(bitboard=ChessTransformer("bitboard").transform_batch(boards), ply=np.array([7]))
+    assert len(store) == 0
+
+
+def test_feature_store_rejects_values_the_field_cannot_hold(tmp_path: Path) -> None:
+    store = FeatureStore.create(tmp_path / "values.store", {"pair": ((2,), np.int8), "score": ((), np.float32)})
+    for pair in ([[500, 3]], [[5, 3.7]]):
+        with pytest.raises(ValueError, match="'pair' changes"):
+            store.append(pair=np.array(pair), score=np.array([0.1]))
+    assert len(store) == 0
+
+    store.append(pair=np.array([[-12, 3.0]]), score=np.array([0.1]))
+    np.testing.assert_array_equal(store["pair"], [[-12, 3]])
+    np.testing.assert_array_equal(store["score"], np.float32([0.1]))
+
+
+def test_feature_store_rejects_other_files(tmp_path: Path) -> None:
+    (tmp_path / "other.store").write_bytes(b"not a store")
+    with pytest.raises(ValueError, match="not a feature store"):
+        FeatureStore(tmp_path / "other.store")
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import chess
+import numpy as np
+
+from src.chess_features import geometry
+from src.chess_features.geometry import (
+    BETWEEN,
+    BISHOP_RAYS,
+    DIRECTION,
+    DIRECTIONS,
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    LINE,
+    RAY_SQUARES,
+    ROOK_RAYS,
+    load_tables,
+)
+
+
+def test_tables_match_python_chess() -> None:
+    for square in chess.SQUARES:
+        assert int(KNIGHT_ATTACKS[square]) == chess.BB_KNIGHT_ATTACKS[square]
+        assert int(KING_ATTACKS[square]) == chess.BB_KING_ATTACKS[square]
+        assert int(ROOK_RAYS[square]) == chess.BB_FILE_ATTACKS[square][0] | chess.BB_RANK_ATTACKS[square][0]
+        assert int(BISHOP_RAYS[square]) == chess.BB_DIAG_ATTACKS[square][0]
+        for other in chess.SQUARES:
+            assert int(BETWEEN[square, other]) == chess.between(square, other)
+            assert int(LINE[square, other]) == (chess.ray(square, other) if square != other else 0)
+
+
+def test_directions() -> None:
+    file_step, rank_step = DIRECTIONS[DIRECTION[chess.B2, chess.E5]]
+    assert (file_step, rank_step) == (1, 1)
+    assert DIRECTION[chess.B2, chess.C4] == -1
+    np.testing.assert_array_equal(RAY_SQUARES[DIRECTION[chess.E4, chess.E1], chess.E4], [chess.E3, chess.E2, chess.E1, 64, 64, 64, 64])
+
+
+def test_load_tables_cache(tmp_path: Path) -> None:
+    path = tmp_path / "geometry.npz"
+    tables = load_tables(path)
+    assert path.exists()
+
+    cached = load_tables(path)
+    assert cached.keys() == tables.keys()
+    for name, table in tables.items():
+        np.testing.assert_array_equal(cached[name], table)
+        assert cached[name].dtype == table.dtype
+
+    np.savez(path, version=np.array(geometry.VERSION - 1))
+    np.testing.assert_array_equal(load_tables(path)["between"], BETWEEN)
+
+
+def test_load_tables_broken_cache(tmp_path: Path) -> None:
+    path = tmp_path / "geometry.npz"
+    load_tables(path)
+    truncated = path.read_bytes()[:100]
+    for content in (b"", truncated):
+        path.write_bytes(content)
+        np.testing.assert_array_equal(load_tables(path)["between"], BETWEEN)
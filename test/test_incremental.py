@@ -0,0 +1,35 @@
+import chess
+import chess.pgn
+import numpy as np
+import pytest
+
+from src.chess_features.chess_features import get_unified_valued_bitboard, to_chess_neighborhoods, to_valued_bitboard
+from src.chess_features.incremental import IncrementalEncoder
+
+
+def assert_encoder_matches_board(encoder: IncrementalEncoder, *, clockwise: bool) -> None:
+    np.testing.assert_array_equal(encoder.valued_bitboard, to_valued_bitboard(encoder.board))
+    np.testing.assert_array_equal(encoder.unified_bitboard, get_unified_valued_bitboard(encoder.board))
+    np.testing.assert_array_equal(encoder.neighborhoods, to_chess_neighborhoods(encoder.board, clockwise=clockwise))
+
+
+@pytest.mark.parametrize("clockwise", [True, False])
+def test_incremental_encoder_push_and_pop(fisher_game: chess.pgn.Game, *, clockwise: bool) -> None:
+    encoder = IncrementalEncoder(clockwise=clockwise)
+
+    for move in fisher_game.mainline_moves():
+        encoder.push(move)
+        assert_encoder_matches_board(encoder, clockwise=clockwise)
+
+    while encoder.board.move_stack:
+        encoder.pop()
+        assert_encoder_matches_board(encoder, clockwise=clockwise)
+
+
+def test_incremental_encoder_special_moves() -> None:
+    # castling, en passant and promotion change three to four squares at once
+    encoder = IncrementalEncoder(chess.Board("r3k2r/1P1p2p1/8/4P3/8/8/8/R3K2R b KQkq - 0 1"))
+
+    for san in ["d5", "exd6", "O-O", "O-O-O", "g5", "bxa8=Q"]:
+        encoder.push_san(san)
+        assert_encoder_matches_board(encoder, clockwise=False)
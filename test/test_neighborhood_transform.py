@@ -1,3 +1,5 @@
+from itertools import product
+
 import chess
 import numpy as np
 
@@ -7,6 +9,7 @@ from src.chess_features.neighborhood_transform import (
     get_file_rank_neighbor,
     get_horse_neighbor,
     get_neighborhood,
+    get_neighborhoods,
 )
 
 
@@ -129,3 +132,14 @@ class TestChessNeighborhoods:
         neighborhood = get_neighborhood(self.board, x=2, y=1, clockwise=True)
         np.testing.assert_equal(neighborhood, [-1, -1, -9, -3, -3, -1, 0, 0, 0, 0, -500, 0, 0, -5, 0, 0, -3])
         np.testing.assert_equal(neighborhood, [-1, -1, -9, -3, -3, -1, 0, 0, 0, 0, -500, 0, 0, -5, 0, 0, -3])
+
+    def test_get_neighborhoods(self):
+        for clockwise in (True, False):
+            expected = [get_neighborhood(self.board, x, y, clockwise=clockwise) for x, y in product(range(8), repeat=2)]
+            np.testing.assert_equal(get_neighborhoods(self.board, clockwise=clockwise), expected)
+
+    def test_get_neighborhoods_batch(self):
+        boards = np.stack([self.board, -self.board, np.flip(self.board, axis=0)])
+        neighborhoods = get_neighborhoods(boards, clockwise=True)
+        assert neighborhoods.shape == (3, 64, 17)
+        np.testing.assert_equal(neighborhoods, [get_neighborhoods(board, clockwise=True) for board in boards])
@@ -0,0 +1,29 @@
+import chess.pgn
+import numpy as np
+
+from src.chess_features.pipeline import read_games, stream_features
+from src.chess_features.transformer import ChessTransformer
+
+PGN_FILES = ["./test/test_files/fisher.pgn", "./test/test_files/game.pgn"]
+
+
+def test_read_games() -> None:
+    games = list(read_games(PGN_FILES))
+    assert len(games) == 2
+    assert all(isinstance(game, chess.pgn.Game) for game in games)
+
+
+def test_stream_features() -> None:
+    transformer = ChessTransformer("bitboard")
+    expected = [transformer.transform_game(game) for game in read_games(PGN_FILES)]
+
+    batches = list(stream_features(PGN_FILES, "bitboard", batch_size=16))
+    features = np.concatenate([batch for batch, _ in batches])
+    metadata = np.concatenate([batch_metadata for _, batch_metadata in batches])
+
+    assert all(len(batch) == 16 for batch, _ in batches[:-1])
+    assert 0 < len(batches[-1][0]) <= 16
+    np.testing.assert_array_equal(features, np.concatenate(expected))
+    np.testing.assert_array_equal(metadata["game"], np.repeat([0, 1], [len(encoded) for encoded in expected]))
+    np.testing.assert_array_equal(metadata["ply"], np.concatenate([np.arange(len(encoded)) for encoded in expected]))
+    np.testing.assert_array_equal(metadata["result"], 0.0)
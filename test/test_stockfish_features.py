@@ -1,6 +1,10 @@
 import chess
+import numpy as np
 
+from src.chess_features.attacks import get_pinned_mask, get_pinned_mask_batch
+from src.chess_features.chess_features import get_piece_bitboards_batch
 from src.chess_features.stockfish_features import (
+    BoardAnalysis,
     ExtractMobility,
     ExtractMobilityArea,
     ExtractNonPawnMaterial,
@@ -9,6 +13,16 @@ from src.chess_features.stockfish_features import (
     ExtractPsqt,
     ExtractStormSquare,
     ExtractStrengthSquare,
+    FeatureExtractionFactory,
+    get_mobility_batch,
+    get_pawnless_flank_batch,
+    get_phase,
+    get_psqt,
+    get_storm_square_batch,
+    get_strength_square_batch,
+    get_tapered_evaluation,
+    get_tapered_evaluation_batch,
+    taper,
 )
 
 
@@ -77,6 +91,14 @@ class TestPsqtBonus:
         board = chess.Board("r1bqk1n1/pppppppp/8/8/8/8/PP2PPPP/RNB1KBNR b KQkq - 1 1")
         assert ExtractPsqt(board, is_midgame=False).extract_feature() == -95
 
+    def test_psqt_batch(self, game_boards: list[chess.Board]):
+
+        psqt = get_psqt(get_piece_bitboards_batch(game_boards))
+
+        assert psqt.shape == (len(game_boards), 2)
+        expected = [[ExtractPsqt(board, is_midgame=is_midgame).extract_feature() for is_midgame in (True, False)] for board in game_boards]
+        np.testing.assert_array_equal(psqt, expected)
+
 
 class TestMobilityArea:
     def test_mobility_area_starting_position(self):
@@ -130,6 +152,58 @@ class TestMobility:
         assert ExtractMobility(board, is_midgame=False).extract_feature() == -73
 
 
+class TestBoardAnalysis:
+    def test_shared_analysis_matches_separate_features(self):
+        board = chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")
+        analysis = BoardAnalysis(board)
+        for feature in (ExtractPsqt, ExtractMobilityArea, ExtractMobility):
+            assert feature(board, is_midgame=True, analysis=analysis).extract_feature() == feature(board, is_midgame=True).extract_feature()
+
+    def test_shared_analysis_computes_once(self):
+        board = chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")
+        analysis = BoardAnalysis(board)
+        ExtractMobilityArea(board, analysis=analysis).extract_feature()
+        mobility_area = analysis.mobility_area_mask(color=chess.WHITE)
+
+        ExtractMobility(board, is_midgame=True, analysis=analysis).extract_feature()
+        assert analysis.mobility_area_mask(color=chess.WHITE) is mobility_area
+        assert ExtractMobilityArea.get_pinned(board, color=chess.WHITE, analysis=analysis) is analysis.pinned(color=chess.WHITE)
+
+    def test_mobility_batch(self, game_boards: list[chess.Board]):
+        boards = [*game_boards, chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")]
+
+        mobility = get_mobility_batch(get_piece_bitboards_batch(boards))
+
+        assert mobility.shape == (len(boards), 2)
+        expected = [[ExtractMobility(board, is_midgame=is_midgame).extract_feature() for is_midgame in (True, False)] for board in boards]
+        np.testing.assert_array_equal(mobility, expected)
+
+
+class TestPinnedMask:
+    def test_pinned_mask_matches_pin(self, game_boards: list[chess.Board]):
+        boards = [
+            *game_boards,
+            chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5"),
+            # the rook gives check, so the empty squares between it and the king count as pinned
+            chess.Board("4k3/8/8/8/4r3/8/8/4K3 w - - 0 1"),
+        ]
+        bitboards = get_piece_bitboards_batch(boards)
+        for color in chess.COLORS:
+            pinned_batch = get_pinned_mask_batch(bitboards, color)
+            for board, pinned in zip(boards, pinned_batch, strict=True):
+                expected = sum(chess.BB_SQUARES[square] for square in chess.SQUARES if board.pin_mask(color, square) != chess.BB_ALL)
+                assert get_pinned_mask(board, color) == expected
+                assert int(pinned) == expected
+
+    def test_get_pinned_directions(self):
+        board = chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")
+        assert ExtractMobilityArea.get_pinned(board, color=chess.WHITE) == [(20, 3), (27, 1), (35, 2), (37, 4)]
+
+        board = chess.Board("4k3/8/8/8/4r3/8/8/4K3 w - - 0 1")
+        assert ExtractMobilityArea.get_pinned(board, color=chess.WHITE) == [(12, 3), (20, 3)]
+        assert ExtractMobilityArea.get_pinned(board, color=chess.BLACK) == []
+
+
 class TestPawnlessFlankColored:
     def test_pawnless_flank_colored_starting_position(self):
         board = chess.Board()
@@ -155,6 +229,11 @@ class TestPawnlessFlankColored:
         board = chess.Board("1k6/4pp1p/8/8/4B3/8/4PP1P/5K2 w - - 2 2")
         assert ExtractPawnlessFlank(board).pawnless_flank_colored(color=chess.BLACK) == 1
 
+    def test_pawnless_flank_colored_no_king(self):
+        board = chess.Board("7k/8/8/8/8/8/8/8 w - - 0 1")
+        assert ExtractPawnlessFlank(board).pawnless_flank_colored(color=chess.WHITE) == 0
+        assert ExtractPawnlessFlank(board).pawnless_flank_colored(color=chess.BLACK) == 1
+
 
 class TestPawnlessFlank:
     def test_pawnless_flank_starting_position(self):
@@ -207,6 +286,58 @@ class TestStrengthSquare:
         board = chess.Board("6k1/4pp1p/8/8/4B3/8/4PP1P/1K6 w - - 2 2")
         assert ExtractStrengthSquare(board).extract_feature() == 0
 
+    def test_strength_square_batch(self, game_boards: list[chess.Board]):
+        boards = [*game_boards, chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")]
+        bitboards = get_piece_bitboards_batch(boards)
+
+        for color in chess.COLORS:
+            expected = [ExtractStrengthSquare(board, color=color).extract_feature() for board in boards]
+            np.testing.assert_array_equal(get_strength_square_batch(bitboards, color=color), expected)
+
+    def test_pawnless_flank_batch(self, game_boards: list[chess.Board]):
+        boards = [
+            *game_boards,
+            chess.Board("1k6/4pp1p/8/8/4B3/8/4PP1P/5K2 w - - 2 2"),
+            chess.Board("7k/8/8/8/8/8/8/K7 w - - 0 1"),
+            chess.Board("7k/8/8/8/8/8/8/8 w - - 0 1"),
+        ]
+        bitboards = get_piece_bitboards_batch(boards)
+
+        for color in chess.COLORS:
+            expected = [ExtractPawnlessFlank(board).pawnless_flank_colored(color=color) for board in boards]
+            np.testing.assert_array_equal(get_pawnless_flank_batch(bitboards, color=color), expected)
+
+
+class TestTaperedEvaluation:
+    def test_phase(self):
+        bitboards = get_piece_bitboards_batch([chess.Board(), chess.Board("1k6/4pp1p/8/8/4B3/8/4PP1P/5K2 w - - 2 2")])
+        np.testing.assert_array_equal(get_phase(bitboards), [128, 0])
+
+    def test_taper(self):
+        np.testing.assert_array_equal(taper([[100, 20], [100, 20], [100, 20]], np.array([128, 0, 32])), [100, 20, 40])
+
+    def test_extract_phases(self):
+        board = chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")
+        for feature_name, feature in FeatureExtractionFactory().get_feature_extraction_map().items():
+            if feature.phased:
+                expected = [feature(board, is_midgame=is_midgame).extract_feature() for is_midgame in (True, False)]
+                np.testing.assert_array_equal(feature(board).extract_phases(), expected, err_msg=feature_name)
+
+    def test_tapered_evaluation(self):
+        board = chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")
+        mobility = ExtractMobility(board).extract_phases() - ExtractMobility(board.mirror()).extract_phases()
+        phased = ExtractPieceValue(board).extract_phases() + ExtractPsqt(board).extract_phases() + mobility
+        phase = get_phase(get_piece_bitboards_batch([board]))[0]
+
+        assert get_tapered_evaluation(chess.Board()) == 0
+        assert get_tapered_evaluation(board) == (phased[0] * phase + phased[1] * (128 - phase)) / 128
+        assert get_tapered_evaluation(board.mirror()) == -get_tapered_evaluation(board)
+
+    def test_tapered_evaluation_batch(self, game_boards: list[chess.Board]):
+        np.testing.assert_array_equal(
+            get_tapered_evaluation_batch(get_piece_bitboards_batch(game_boards)), [get_tapered_evaluation(board) for board in game_boards]
+        )
+
 
 class TestStormSquare:
     def test_storm_square_starting_position(self):
@@ -232,3 +363,15 @@ class TestStormSquare:
     def test_storm_square_endgame_2(self):
         board = chess.Board("6k1/4pp1p/8/8/4B3/8/4PP1P/1K6 w - - 2 2")
         assert ExtractStormSquare(board).extract_feature() == 0
+
+    def test_storm_square_blocked(self):
+        board = chess.Board("4k3/8/8/3p4/3P4/8/1P6/4K3 w - - 0 1")
+        assert ExtractStormSquare(board).extract_feature() == -546
+
+    def test_storm_square_batch(self, game_boards: list[chess.Board]):
+        boards = [*game_boards, chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")]
+        bitboards = get_piece_bitboards_batch(boards)
+
+        for color in chess.COLORS:
+            expected = [ExtractStormSquare(board, color=color).extract_feature() for board in boards]
+            np.testing.assert_array_equal(get_storm_square_batch(bitboards, color=color), expected)
@@ -6,17 +6,50 @@ import numpy as np
 
 from src.chess_features.chess_features import (
     bitboard_to_bitvector,
+    get_piece_bitboards_batch,
+    get_unified_valued_bitboard,
+    get_unified_valued_bitboard_batch,
     to_bit_attack_map,
+    to_bit_attack_map_batch,
     to_bit_defend_map,
+    to_bit_defend_map_batch,
     to_bitboard,
+    to_bitboard_batch,
     to_chess_neighborhoods,
+    to_chess_neighborhoods_batch,
     to_fen,
+    to_packed_bit_attack_map,
+    to_packed_bit_attack_map_batch,
+    to_packed_bit_defend_map,
+    to_packed_bit_defend_map_batch,
+    to_packed_bitboard,
+    to_packed_bitboard_batch,
     to_san,
+    to_unified_bitboard,
+    to_unified_bitboard_batch,
     to_unified_neg_bitboard,
+    to_unified_neg_bitboard_batch,
     to_valued_attack_map,
+    to_valued_attack_map_batch,
     to_valued_bitboard,
+    to_valued_bitboard_batch,
     to_valued_defend_map,
+    to_valued_defend_map_batch,
     to_white_moving,
+    unpack_bitboards,
+)
+from src.chess_features.stockfish_features import (
+    ExtractMobility,
+    ExtractMobilityArea,
+    ExtractNonPawnMaterial,
+    ExtractPawnlessFlank,
+    ExtractPieceValue,
+    ExtractPsqt,
+    ExtractStormSquare,
+    ExtractStrengthSquare,
+    FeatureExtractionFactory,
+    to_stockfish_representation,
+    to_stockfish_representation_batch,
 )
 
 
@@ -102,16 +135,13 @@ def test_to_unified_bitboard() -> None:
     np.testing.assert_array_equal(bitboard, loaded_bitboard)
 
 
-def test_to_pgn() -> None:
+def test_to_pgn(fisher_game: chess.pgn.Game) -> None:
     board = chess.Board()
 
-    with Path("./test/test_files/fisher.pgn").open(encoding="utf-8") as pgn_file:
-        first_game = chess.pgn.read_game(pgn_file)
-
     with Path("./test/test_files/expected_san.txt").open(encoding="utf-8") as expected_san_file:
         expected_san = expected_san_file.read()
 
-    node = first_game
+    node = fisher_game
     while node.variations:
         move = node.variation(0).move
         board.push(move)
@@ -200,4 +230,135 @@ def test_to_chess_neighborhood() -> None:
 
 
 def test_to_stockfish_representation() -> None:
-    raise NotImplementedError
+    board = chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")
+    vector = to_stockfish_representation(board)
+
+    assert vector.dtype == np.float32
+    assert FeatureExtractionFactory().get_vector_names() == [
+        "NonPawnMaterial_mg",
+        "NonPawnMaterial_eg",
+        "PieceValue_mg",
+        "PieceValue_eg",
+        "Psqt_mg",
+        "Psqt_eg",
+        "MobilityArea",
+        "Mobility_mg",
+        "Mobility_eg",
+        "PawnlessFlank",
+        "StrengthSquare",
+        "StormSquare",
+    ]
+    expected = [
+        ExtractNonPawnMaterial(board, is_midgame=True).extract_feature(),
+        ExtractNonPawnMaterial(board, is_midgame=False).extract_feature(),
+        ExtractPieceValue(board, is_midgame=True).extract_feature(),
+        ExtractPieceValue(board, is_midgame=False).extract_feature(),
+        ExtractPsqt(board, is_midgame=True).extract_feature(),
+        ExtractPsqt(board, is_midgame=False).extract_feature(),
+        ExtractMobilityArea(board).extract_feature(),
+        ExtractMobility(board, is_midgame=True).extract_feature(),
+        ExtractMobility(board, is_midgame=False).extract_feature(),
+        ExtractPawnlessFlank(board).extract_feature(),
+        ExtractStrengthSquare(board).extract_feature(),
+        ExtractStormSquare(board).extract_feature(),
+    ]
+    np.testing.assert_array_equal(vector, expected)
+    np.testing.assert_array_equal(to_stockfish_representation(board, ["Psqt", "MobilityArea"]), expected[4:7])
+
+
+def test_to_stockfish_representation_batch(game_boards: list[chess.Board]) -> None:
+    boards = [*game_boards, chess.Board("b2rk1n1/p1p1pp2/pP1p2b1/1P1N1P1p/2qBK3/4B3/7P/RN2r2R w KQkq - 2 5")]
+    bitboards = get_piece_bitboards_batch(boards)
+    factory = FeatureExtractionFactory()
+
+    matrix = to_stockfish_representation_batch(bitboards)
+    assert matrix.shape == (len(boards), len(factory.get_vector_names()))
+    assert matrix.dtype == np.float32
+    np.testing.assert_array_equal(matrix, [to_stockfish_representation(board) for board in boards])
+    np.testing.assert_array_equal(
+        to_stockfish_representation_batch(bitboards, ["StrengthSquare", "Mobility"], color=chess.BLACK),
+        [factory.extract(board, ["StrengthSquare", "Mobility"], color=chess.BLACK) for board in boards],
+    )
+
+
+def test_bitboard_batches(game_boards: list[chess.Board]) -> None:
+    bitboards = get_piece_bitboards_batch(game_boards)
+    values = {"queen": 10, "king": 100, "rook": 6, "bishop": 4, "knight": 2, "pawn": 1}
+
+    assert bitboards.shape == (len(game_boards), 12)
+    np.testing.assert_array_equal(to_bitboard_batch(bitboards), [to_bitboard(board) for board in game_boards])
+    np.testing.assert_array_equal(to_unified_bitboard_batch(bitboards), [to_unified_bitboard(board) for board in game_boards])
+    np.testing.assert_array_equal(to_unified_neg_bitboard_batch(bitboards), [to_unified_neg_bitboard(board) for board in game_boards])
+    np.testing.assert_array_equal(to_valued_bitboard_batch(bitboards, values), [to_valued_bitboard(board, values) for board in game_boards])
+    np.testing.assert_array_equal(
+        get_unified_valued_bitboard_batch(bitboards, values),
+        [get_unified_valued_bitboard(board, values) for board in game_boards],
+    )
+
+
+def test_packed_bitboards(game_boards: list[chess.Board]) -> None:
+    bitboards = get_piece_bitboards_batch(game_boards)
+    packed_functions = [
+        (to_packed_bitboard, to_packed_bitboard_batch, to_bitboard, (12,)),
+        (to_packed_bit_attack_map, to_packed_bit_attack_map_batch, to_bit_attack_map, (2,)),
+        (to_packed_bit_defend_map, to_packed_bit_defend_map_batch, to_bit_defend_map, (2,)),
+    ]
+
+    for to_packed, to_packed_batch, to_unpacked, shape in packed_functions:
+        packed = to_packed_batch(bitboards)
+        assert packed.shape == (len(game_boards), *shape)
+        assert packed.dtype == np.uint64
+        np.testing.assert_array_equal(packed, [to_packed(board) for board in game_boards])
+        np.testing.assert_array_equal(unpack_bitboards(packed), [to_unpacked(board) for board in game_boards])
+
+
+def test_bit_attack_and_defend_maps_match_attackers(game_boards: list[chess.Board]) -> None:
+    bitboards = get_piece_bitboards_batch(game_boards)
+    attack_maps = to_bit_attack_map_batch(bitboards)
+    defend_maps = to_bit_defend_map_batch(bitboards)
+
+    for board, attack_map, defend_map in zip(game_boards, attack_maps, defend_maps, strict=True):
+        expected = np.zeros((2, 64))
+        for square in chess.SQUARES:
+            expected[0, square] = bool(board.attackers(chess.WHITE, square))
+            expected[1, square] = bool(board.attackers(chess.BLACK, square))
+        expected = np.flip(expected.reshape((2, 8, 8)), axis=1)
+
+        np.testing.assert_array_equal(to_bit_attack_map(board), expected)
+        np.testing.assert_array_equal(to_bit_defend_map(board), expected[::-1])
+        np.testing.assert_array_equal(attack_map, expected)
+        np.testing.assert_array_equal(defend_map, expected[::-1])
+
+
+def test_valued_attack_and_defend_maps_match_least_valuable_attackers(game_boards: list[chess.Board]) -> None:
+    bitboards = get_piece_bitboards_batch(game_boards)
+    values = {"queen": 10, "king": 100, "rook": 6, "bishop": 4, "knight": 2, "pawn": 1}
+    values_array = np.array([1, 2, 4, 6, 10, 100] * 2).reshape((-1, 1, 1))
+    attack_maps = to_valued_attack_map_batch(bitboards, values)
+    defend_maps = to_valued_defend_map_batch(bitboards, values)
+
+    for board, attack_map, defend_map in zip(game_boards, attack_maps, defend_maps, strict=True):
+        expected_attack = np.zeros((12, 64))
+        expected_defend = np.zeros((12, 64))
+        for square in chess.SQUARES:
+            for color, offset in ((chess.WHITE, 0), (chess.BLACK, 6)):
+                min_attacker = min((board.piece_type_at(attacker) for attacker in board.attackers(color, square)), default=None)
+                if min_attacker is not None:
+                    expected_attack[offset + min_attacker - 1, square] = 1
+                    expected_defend[6 - offset + min_attacker - 1, square] = 1
+        expected_attack = np.flip(expected_attack.reshape((12, 8, 8)), axis=1) * values_array
+        expected_defend = np.flip(expected_defend.reshape((12, 8, 8)), axis=1) * values_array
+
+        np.testing.assert_array_equal(to_valued_attack_map(board, values), expected_attack)
+        np.testing.assert_array_equal(to_valued_defend_map(board, values), expected_defend)
+        np.testing.assert_array_equal(attack_map, expected_attack)
+        np.testing.assert_array_equal(defend_map, expected_defend)
+
+
+def test_to_chess_neighborhoods_batch(game_boards: list[chess.Board]) -> None:
+    bitboards = get_piece_bitboards_batch(game_boards)
+
+    for clockwise in (True, False):
+        neighborhoods = to_chess_neighborhoods_batch(bitboards, clockwise=clockwise)
+        assert neighborhoods.shape == (len(game_boards), 64, 17)
+        np.testing.assert_array_equal(neighborhoods, [to_chess_neighborhoods(board, clockwise=clockwise) for board in game_boards])
@@ -0,0 +1,184 @@
+import chess
+import chess.pgn
+import numpy as np
+import pytest
+
+from src.chess_features.transformer import ChessTransformer
+
+
+@pytest.mark.parametrize(
+    "transformation_type",
+    [
+        "bit_attack",
+        "bit_defend",
+        "bitboard",
+        "neighborhood",
+        "packed_bit_attack",
+        "packed_bit_defend",
+        "packed_bitboard",
+        "stockfish",
+        "unified_neg_bitboard",
+        "unified_valued_bitboard",
+        "valued_attack",
+        "valued_bitboard",
+        "valued_defend",
+    ],
+)
+def test_transform_batch(transformation_type: str, game_boards: list[chess.Board]) -> None:
+    transformer = ChessTransformer(transformation_type)
+
+    batch = transformer.transform_batch(game_boards)
+
+    assert batch.shape == (len(game_boards), *transformer.extractor.shape)
+    assert batch.dtype == transformer.extractor.dtype
+    np.testing.assert_array_equal(batch, np.stack([transformer(board) for board in game_boards]))
+
+
+def test_transform_batch_out(game_boards: list[chess.Board]) -> None:
+    transformer = ChessTransformer("bitboard")
+    out = np.empty((len(game_boards), 12, 8, 8), dtype=np.uint8)
+
+    batch = transformer.transform_batch([board.fen() for board in game_boards], out=out)
+
+    assert batch is out
+    np.testing.assert_array_equal(batch, np.stack([transformer(board) for board in game_boards]))
+
+
+def test_transform_batch_wrong_out_shape() -> None:
+    transformer = ChessTransformer("bitboard")
+    with pytest.raises(ValueError, match="shape"):
+        transformer.transform_batch([chess.Board()], out=np.empty((2, 12, 8, 8), dtype=np.uint8))
+
+
+def test_transform_batch_not_an_array() -> None:
+    transformer = ChessTransformer("fen")
+    with pytest.raises(TypeError):
+        transformer.transform_batch([chess.Board()])
+
+
+@pytest.mark.parametrize("transformation_type", ["bitboard", "valued_attack", "neighborhood"])
+def test_transform_game(transformation_type: str, fisher_game: chess.pgn.Game, game_boards: list[chess.Board]) -> None:
+    boards = game_boards[:-1]
+    transformer = ChessTransformer(transformation_type)
+
+    encoded_game = transformer.transform_game(fisher_game)
+    encoded_moves = transformer.transform_game(fisher_game.mainline_moves())
+
+    expected = np.stack([transformer(board) for board in boards])
+    np.testing.assert_array_equal(encoded_game, expected)
+    np.testing.assert_array_equal(encoded_moves, expected)
+
+
+def test_transform_game_without_bitboard_batches(fisher_game: chess.pgn.Game) -> None:
+    transformer = ChessTransformer("bitboard")
+    transformer.extractor.from_bitboards = False
+
+    np.testing.assert_array_equal(transformer.transform_game(fisher_game), ChessTransformer("bitboard").transform_game(fisher_game))
+
+
+@pytest.mark.parametrize(
+    ("transformation_type", "dtype"),
+    [
+        ("bit_attack", np.float32),
+        ("bit_defend", np.int8),
+        ("bitboard", np.bool_),
+        ("neighborhood", np.int16),
+        ("stockfish", np.int16),
+        ("unified_neg_bitboard", np.float16),
+        ("unified_valued_bitboard", np.int16),
+        ("valued_attack", np.int8),
+        ("valued_bitboard", np.float64),
+        ("valued_defend", np.uint8),
+    ],
+)
+def test_dtype(transformation_type: str, dtype: type[np.generic], game_boards: list[chess.Board]) -> None:
+    transformer = ChessTransformer(transformation_type, dtype=dtype)
+    values = {"queen": 9, "king": 100, "rook": 5, "bishop": 3, "knight": 3, "pawn": 1}
+    expected = ChessTransformer(transformation_type).transform_batch(game_boards, values=values)
+
+    batch = transformer.transform_batch(game_boards, values=values)
+    single = transformer(game_boards[-1], values=values)
+
+    assert batch.dtype == dtype
+    assert single.dtype == dtype
+    np.testing.assert_array_equal(batch, expected.astype(dtype))
+    np.testing.assert_array_equal(single, expected[-1].astype(dtype))
+
+
+@pytest.mark.parametrize(
+    ("transformation_type", "dtype"),
+    [
+        ("neighborhood", np.int16),
+        ("unified_valued_bitboard", np.int16),
+        ("valued_attack", np.int16),
+        ("valued_bitboard", np.uint16),
+    ],
+)
+def test_dtype_default_values(transformation_type: str, dtype: type[np.generic], game_boards: list[chess.Board]) -> None:
+    expected = ChessTransformer(transformation_type).transform_batch(game_boards)
+
+    np.testing.assert_array_equal(ChessTransformer(transformation_type, dtype=dtype).transform_batch(game_boards), expected)
+    assert expected.max() == 500
+
+
+@pytest.mark.parametrize(
+    ("transformation_type", "dtype", "values"),
+    [
+        ("neighborhood", np.int8, None),
+        ("stockfish", np.int8, None),
+        ("unified_neg_bitboard", np.uint8, None),
+        ("unified_valued_bitboard", np.uint16, None),
+        ("valued_attack", np.int8, None),
+        ("valued_bitboard", np.int8, None),
+        ("valued_bitboard", np.int8, {"queen": 9.7, "king": 100, "rook": 5, "bishop": 3, "knight": 3, "pawn": 0.5}),
+        ("valued_defend", np.uint8, None),
+    ],
+)
+def test_dtype_out_of_range(transformation_type: str, dtype: type[np.generic], values: dict | None) -> None:
+    transformer = ChessTransformer(transformation_type, dtype=dtype)
+    with pytest.raises(ValueError, match=r"fit|cannot hold"):
+        transformer(chess.Board(), values=values)
+    with pytest.raises(ValueError, match=r"fit|cannot hold"):
+        transformer.transform_batch([chess.Board()], values=values)
+
+
+@pytest.mark.parametrize("transformation_type", ["fen", "packed_bitboard"])
+def test_dtype_not_supported(transformation_type: str) -> None:
+    with pytest.raises(ValueError, match="dtype"):
+        ChessTransformer(transformation_type, dtype=np.int8)
+
+
+def test_cache(game_boards: list[chess.Board]) -> None:
+    transformer = ChessTransformer("valued_attack", cache_size=8)
+    expected = ChessTransformer("valued_attack").transform_batch(game_boards)
+
+    np.testing.assert_array_equal(transformer.transform_batch(game_boards[:4]), expected[:4])
+    assert transformer.cache_info() == (0, 4, 8, 4)
+
+    # the 4 cached game_boards are hits, the others evict them
+    np.testing.assert_array_equal(transformer.transform_batch(game_boards[:10]), expected[:10])
+    assert transformer.cache_info() == (4, 10, 8, 8)
+
+    encoded = transformer(game_boards[9])
+    np.testing.assert_array_equal(encoded, expected[9])
+    assert not encoded.flags.writeable
+    assert transformer(game_boards[9].fen()) is encoded
+    assert transformer.cache_info() == (6, 10, 8, 8)
+
+    values = {"queen": 10, "king": 100, "rook": 6, "bishop": 4, "knight": 2, "pawn": 1}
+    np.testing.assert_array_equal(transformer(game_boards[9], values=values), ChessTransformer("valued_attack")(game_boards[9], values=values))
+    assert transformer.cache_info().misses == 11
+
+
+def test_cache_transform_game(fisher_game: chess.pgn.Game) -> None:
+    transformer = ChessTransformer("bitboard", cache_size=1000)
+    expected = ChessTransformer("bitboard").transform_game(fisher_game)
+
+    np.testing.assert_array_equal(transformer.transform_game(fisher_game), expected)
+    np.testing.assert_array_equal(transformer.transform_game(fisher_game), expected)
+    assert transformer.cache_info().hits >= len(expected)
+
+
+def test_cache_not_supported() -> None:
+    with pytest.raises(ValueError, match="cached"):
+        ChessTransformer("fen", cache_size=8)